@@ -1,5 +1,8 @@
+from django.db.models import Exists, OuterRef
 from rest_framework import filters
 
+from recipes.models import Recipe
+
 
 class RecipeFilterBackend(filters.BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
@@ -7,18 +10,27 @@ class RecipeFilterBackend(filters.BaseFilterBackend):
         is_in_shopping_cart = request.query_params.get("is_in_shopping_cart")
         author_id = request.query_params.get("author")
         tags = request.query_params.getlist("tags")
+        search = request.query_params.get("search")
+        text = request.query_params.get("q")
+        if search:
+            queryset = queryset.search(search)
+        if text:
+            queryset = queryset.full_text_search(text)
         if author_id:
             queryset = queryset.filter(author__id=author_id)
         if tags:
-            queryset = queryset.filter(tags__slug__in=tags).distinct()
+            queryset = queryset.annotate(has_tags=Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe=OuterRef("pk"), tag__slug__in=tags)
+            )).filter(has_tags=True)
         if not request.user.is_authenticated:
             return queryset
+        if (is_favorited or is_in_shopping_cart) and (
+            "is_favorited" not in queryset.query.annotations
+        ):
+            queryset = queryset.with_user_flags(request.user)
         if is_favorited:
-            queryset = queryset.filter(favorite_for__user=request.user)
+            queryset = queryset.filter(is_favorited=True)
         if is_in_shopping_cart:
-            queryset = queryset.filter(in_shopping_carts__user=request.user)
+            queryset = queryset.filter(is_in_shopping_cart=True)
         return queryset
-
-
-class IngredientSearchFilter(filters.SearchFilter):
-    search_param = "name"
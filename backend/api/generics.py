@@ -1,4 +1,12 @@
+import hashlib
+
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, urlencode
 from rest_framework import generics, mixins
+from rest_framework.renderers import JSONRenderer
+
+from recipes.versions import get_version
 
 
 class CreateDeleteAPIView(
@@ -9,3 +17,42 @@ class CreateDeleteAPIView(
 
     def delete(self, request, *args, **kwargs):
         return self.destroy(request, *args, **kwargs)
+
+
+class CachedCatalogMixin:
+    catalog = None
+    catalog_version = None
+
+    def use_catalog_cache(self, request):
+        return True
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_catalog_cache(request):
+            return super().list(request, *args, **kwargs)
+        query = urlencode(
+            sorted(
+                (key, sorted(set(values)))
+                for key, values in request.query_params.lists()
+            ),
+            doseq=True,
+        )
+        version = self.catalog_version = get_version(self.catalog)
+        digest = hashlib.md5(
+            f"{version}:{request.get_host()}?{query}".encode()).hexdigest()
+        etag = f'"{digest}"'
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+        key = f"catalog:{self.catalog}:{digest}"
+        content = cache.get(key)
+        if content is None:
+            content = JSONRenderer().render(
+                self.get_catalog(request, *args, **kwargs))
+            cache.set(key, content)
+        response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = etag
+        return response
+
+    def get_catalog(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs).data
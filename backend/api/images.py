@@ -0,0 +1,64 @@
+import binascii
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from PIL import Image
+from rest_framework import serializers
+
+DECODE_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 1024 * 1024
+IMAGE_EXTENSIONS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "GIF": "gif",
+    "WEBP": "webp",
+}
+
+
+def decode_base64(payload):
+    if len(payload) * 3 // 4 > settings.RECIPE_IMAGE_MAX_SIZE:
+        raise serializers.ValidationError("Размер картинки слишком большой")
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    try:
+        for start in range(0, len(payload), DECODE_CHUNK_SIZE):
+            file.write(binascii.a2b_base64(
+                payload[start:start + DECODE_CHUNK_SIZE]))
+    except binascii.Error:
+        file.close()
+        raise serializers.ValidationError("Картинка повреждена")
+    file.seek(0)
+    return file
+
+
+def open_image(file):
+    try:
+        with Image.open(file) as image:
+            image.verify()
+        file.seek(0)
+        return Image.open(file)
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        raise serializers.ValidationError("Файл не является картинкой")
+
+
+def decode_image(data):
+    header, _, payload = data.partition(",")
+    if not header.startswith("data:") or not payload:
+        raise serializers.ValidationError("Картинка должна быть в base64")
+    file = decode_base64(payload)
+    with open_image(file) as image:
+        image_format = image.format
+        if image_format not in IMAGE_EXTENSIONS:
+            file.close()
+            raise serializers.ValidationError(
+                "Неподдерживаемый формат картинки")
+        max_dimension = settings.RECIPE_IMAGE_MAX_DIMENSION
+        if max(image.size) > max_dimension:
+            resized = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+            image.thumbnail((max_dimension, max_dimension))
+            image.save(resized, format=image_format)
+            file.close()
+            file = resized
+            file.seek(0)
+    return File(file, name=f"{uuid.uuid4()}.{IMAGE_EXTENSIONS[image_format]}")
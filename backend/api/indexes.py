@@ -0,0 +1,207 @@
+import bisect
+import datetime
+import itertools
+import threading
+from collections import namedtuple
+
+import numpy as np
+from django.db.models import Q
+from django.utils import timezone
+
+from recipes.models import Ingredient, IngredientRecipe, Recipe
+from recipes.versions import INGREDIENTS, RECIPES, get_version
+
+SYNC_LAG = datetime.timedelta(minutes=5)
+MAX_DEAD_RATIO = 0.2
+
+RecipeIndexState = namedtuple(
+    "RecipeIndexState",
+    "version synced_at recipe_ids updated sizes alive postings",
+)
+
+
+class IngredientIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = (None, [], [])
+
+    def load(self, version=None):
+        version = version or get_version(INGREDIENTS)
+        if self.state[0] != version:
+            with self.lock:
+                if self.state[0] != version:
+                    self.state = (version, *self.build())
+        return self.state[1:]
+
+    def build(self):
+        items = sorted(
+            (
+                {"id": pk, "name": name, "measurement_unit": unit}
+                for pk, name, unit in Ingredient.objects.values_list(
+                    "id", "name", "measurement_unit").iterator()
+            ),
+            key=lambda item: (item["name"].casefold(), item["id"]),
+        )
+        return [item["name"].casefold() for item in items], items
+
+    def search(self, query, limit=None, version=None):
+        keys, items = self.load(version)
+        query = query.casefold()
+        start = bisect.bisect_left(keys, query)
+        end = start
+        while end < len(keys) and keys[end].startswith(query):
+            end += 1
+        found = items[start:end]
+        if limit is None or len(found) < limit:
+            found += [
+                item for key, item in zip(keys, items)
+                if query in key and not key.startswith(query)
+            ]
+        return found[:limit]
+
+
+class RecipeIngredientIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = None
+
+    def load(self):
+        version = get_version(RECIPES)
+        state = self.state
+        if state is None:
+            with self.lock:
+                if self.state is None:
+                    self.state = self.build(version)
+        elif state.version != version and self.lock.acquire(blocking=False):
+            try:
+                self.state = self.refresh(self.state, version)
+            finally:
+                self.lock.release()
+        return self.state
+
+    def build(self, version):
+        synced_at = timezone.now()
+        recipes = list(Recipe.objects.order_by("id").values_list(
+            "id", "updated_at").iterator())
+        return self.append(
+            RecipeIndexState(
+                version=version,
+                synced_at=synced_at,
+                recipe_ids=np.empty(0, dtype=np.int64),
+                updated=np.empty(0, dtype=np.float64),
+                sizes=np.empty(0, dtype=np.int32),
+                alive=np.empty(0, dtype=bool),
+                postings={},
+            ),
+            recipes,
+            self.load_pairs(IngredientRecipe.objects.all()),
+        )
+
+    def refresh(self, state, version):
+        synced_at = timezone.now()
+        recent = list(Recipe.objects.filter(
+            Q(updated_at__gte=state.synced_at - SYNC_LAG)
+            | Q(id__gt=int(state.recipe_ids.max(initial=0)))
+        ).values_list("id", "updated_at"))
+        indexed = np.isin(state.recipe_ids, [pk for pk, _ in recent])
+        indexed &= state.alive
+        current = dict(zip(
+            state.recipe_ids[indexed].tolist(),
+            state.updated[indexed].tolist(),
+        ))
+        state = self.replace(
+            state._replace(version=version, synced_at=synced_at),
+            [
+                (pk, updated_at) for pk, updated_at in recent
+                if current.get(pk) != updated_at.timestamp()
+            ],
+        )
+        if Recipe.objects.count() != np.count_nonzero(state.alive):
+            existing = np.fromiter(
+                Recipe.objects.values_list("id", flat=True).iterator(),
+                dtype=np.int64,
+            )
+            alive = state.alive & np.isin(state.recipe_ids, existing)
+            missing = np.setdiff1d(existing, state.recipe_ids[alive])
+            if len(missing) > MAX_DEAD_RATIO * len(alive):
+                return self.build(version)
+            state = self.replace(
+                state._replace(alive=alive),
+                list(Recipe.objects.filter(
+                    id__in=missing.tolist()).values_list("id", "updated_at")),
+            )
+        if np.count_nonzero(~state.alive) > MAX_DEAD_RATIO * len(state.alive):
+            return self.build(version)
+        return state
+
+    def replace(self, state, recipes):
+        recipe_ids = [pk for pk, _ in recipes]
+        alive = state.alive.copy()
+        alive[np.isin(state.recipe_ids, recipe_ids)] = False
+        return self.append(
+            state._replace(alive=alive),
+            recipes,
+            self.load_pairs(IngredientRecipe.objects.filter(
+                recipe_id__in=recipe_ids)),
+        )
+
+    def append(self, state, recipes, pairs):
+        if not recipes:
+            return state
+        first = len(state.recipe_ids)
+        recipe_ids = np.array([pk for pk, _ in recipes], dtype=np.int64)
+        pairs = pairs[np.isin(pairs[:, 0], recipe_ids)]
+        order = np.argsort(recipe_ids)
+        positions = first + order[
+            np.searchsorted(recipe_ids[order], pairs[:, 0])]
+        ingredients = pairs[:, 1]
+        order = np.lexsort((positions, ingredients))
+        positions, ingredients = positions[order], ingredients[order]
+        keys, starts = np.unique(ingredients, return_index=True)
+        postings = dict(state.postings)
+        for key, chunk in zip(
+            keys.tolist(), np.split(positions.astype(np.int32), starts[1:])
+        ):
+            if key in postings:
+                chunk = np.concatenate([postings[key], chunk])
+            postings[key] = chunk
+        return state._replace(
+            recipe_ids=np.concatenate([state.recipe_ids, recipe_ids]),
+            updated=np.concatenate([
+                state.updated,
+                [updated_at.timestamp() for _, updated_at in recipes],
+            ]),
+            sizes=np.concatenate([
+                state.sizes,
+                np.bincount(
+                    positions - first, minlength=len(recipes)
+                ).astype(np.int32),
+            ]),
+            alive=np.concatenate([
+                state.alive, np.ones(len(recipes), dtype=bool)]),
+            postings=postings,
+        )
+
+    def load_pairs(self, queryset):
+        return np.fromiter(
+            itertools.chain.from_iterable(
+                queryset.values_list("recipe_id", "ingredient_id").iterator()
+            ),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+
+    def search(self, ingredient_ids):
+        state = self.load()
+        matches = np.zeros(len(state.recipe_ids), dtype=np.int32)
+        for ingredient_id in set(ingredient_ids):
+            positions = state.postings.get(ingredient_id)
+            if positions is not None:
+                matches[positions] += 1
+        found = np.flatnonzero((matches > 0) & state.alive)
+        coverage = matches[found] / state.sizes[found]
+        order = np.lexsort((-state.recipe_ids[found], -coverage))
+        return state.recipe_ids[found][order], coverage[order]
+
+
+ingredient_index = IngredientIndex()
+recipe_ingredient_index = RecipeIngredientIndex()
@@ -0,0 +1,14 @@
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+
+
+class FallbackContentNegotiation(DefaultContentNegotiation):
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except NotAcceptable:
+            format_query = format_suffix or request.query_params.get(
+                self.settings.URL_FORMAT_OVERRIDE)
+            if format_query:
+                renderers = self.filter_renderers(renderers, format_query)
+            return renderers[0], renderers[0].media_type
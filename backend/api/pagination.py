@@ -0,0 +1,108 @@
+import base64
+import binascii
+from collections import OrderedDict
+
+from django.utils.dateparse import parse_datetime
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class RecipeCursorPagination(pagination.CursorPagination):
+    ordering = ("-pub_date", "-id")
+    page_size_query_param = "limit"
+
+
+class SubscriptionCursorPagination(pagination.CursorPagination):
+    ordering = ("-id",)
+    page_size_query_param = "limit"
+
+
+class CursorOptInPagination(pagination.LimitOffsetPagination):
+    cursor_pagination_class = None
+    ranked_query_params = ()
+
+    def use_cursor(self, request):
+        params = request.query_params
+        return (
+            self.cursor_pagination_class.cursor_query_param in params
+            and not any(params.get(name) for name in self.ranked_query_params)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class RecipePagination(CursorOptInPagination):
+    cursor_pagination_class = RecipeCursorPagination
+    ranked_query_params = ("search", "q")
+
+
+class SubscriptionPagination(CursorOptInPagination):
+    cursor_pagination_class = SubscriptionCursorPagination
+
+
+class FeedPagination(pagination.BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    invalid_cursor_message = "Неверный курсор"
+
+    def paginate_feed(self, request, fetch):
+        self.request = request
+        limit = self.get_page_size(request)
+        rows = fetch(limit + 1, self.decode_cursor(request))
+        self.next_position = rows[limit - 1] if len(rows) > limit else None
+        return [recipe_id for _, recipe_id in rows[:limit]]
+
+    def get_page_size(self, request):
+        limit = request.query_params.get(self.page_size_query_param, "")
+        if limit.isdigit() and int(limit) > 0:
+            return int(limit)
+        return api_settings.PAGE_SIZE
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor is None:
+            return None
+        try:
+            pub_date, recipe_id = base64.urlsafe_b64decode(
+                cursor.encode()).decode().split("|")
+            position = (parse_datetime(pub_date), int(recipe_id))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        pub_date, recipe_id = position
+        return base64.urlsafe_b64encode(
+            f"{pub_date.isoformat()}|{recipe_id}".encode()).decode()
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position),
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", None),
+            ("results", data),
+        ]))
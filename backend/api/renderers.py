@@ -0,0 +1,26 @@
+import json
+
+from rest_framework import renderers
+
+
+class ShoppingCartRenderer(renderers.BaseRenderer):
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+class PlainTextRenderer(ShoppingCartRenderer):
+    media_type = "text/plain"
+    format = "txt"
+
+
+class CSVRenderer(ShoppingCartRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class PDFRenderer(ShoppingCartRenderer):
+    media_type = "application/pdf"
+    format = "pdf"
+    charset = None
@@ -1,14 +1,17 @@
-import base64
-import uuid
-
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from djoser import serializers as djoser_serializers
 from rest_framework import serializers
 
+from api.images import decode_image
+from api.utils import get_subscribed_ids
+from recipes.images import variant_name
 from recipes.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
-                            ShoppingCartRecipe, Tag)
+                            RecipeQuerySet, ShoppingCartIngredient,
+                            ShoppingCartRecipe, SimilarRecipe, Tag)
+from recipes.signals import cart_receivers_disabled
 from users.models import Subscription
 
 User = get_user_model()
@@ -44,12 +47,10 @@ class UserSerialiser(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        if not self.context.get("request").user.is_authenticated:
+        request = self.context.get("request")
+        if not request.user.is_authenticated:
             return False
-        return Subscription.objects.filter(
-            subscribed_to=obj,
-            subscriber=self.context.get("request").user,
-        ).exists()
+        return obj.id in get_subscribed_ids(request)
 
 
 class ImageBase64(serializers.Field):
@@ -57,8 +58,22 @@ class ImageBase64(serializers.Field):
         return value.url
 
     def to_internal_value(self, data):
-        filename = str(uuid.uuid4()) + ".png"
-        return ContentFile(base64.b64decode(data.split(",")[1]), filename)
+        return decode_image(data)
+
+
+class ImageVariant(serializers.Field):
+    def __init__(self, variant, webp=False, **kwargs):
+        self.variant = variant
+        self.webp = webp
+        kwargs["read_only"] = True
+        kwargs.setdefault("source", "*")
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        if not recipe.has_image_variants:
+            return recipe.image.url
+        return recipe.image.storage.url(
+            variant_name(recipe.image.name, self.variant, self.webp))
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -92,8 +107,9 @@ class IngredientRecipeSerializer(serializers.ModelSerializer):
 
 class LimitedRecipesListSerializer(serializers.ListSerializer):
     def to_representation(self, data):
-        limit = self.context.get("request").query_params.get("recipes_limit")
-        if limit:
+        limit = self.context.get("request").query_params.get(
+            "recipes_limit", "")
+        if limit.isdigit():
             data = data.all()[: int(limit)]
         return super(
             LimitedRecipesListSerializer, self).to_representation(data)
@@ -103,6 +119,10 @@ class RecipeSerializer(serializers.ModelSerializer):
     ingredients = IngredientRecipeSerializer(many=True)
     author = UserSerialiser(read_only=True)
     image = ImageBase64()
+    image_thumb = ImageVariant("thumb")
+    image_thumb_webp = ImageVariant("thumb", webp=True)
+    image_medium = ImageVariant("medium")
+    image_medium_webp = ImageVariant("medium", webp=True)
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
 
@@ -114,6 +134,10 @@ class RecipeSerializer(serializers.ModelSerializer):
             "ingredients",
             "tags",
             "image",
+            "image_thumb",
+            "image_thumb_webp",
+            "image_medium",
+            "image_medium_webp",
             "name",
             "text",
             "cooking_time",
@@ -123,15 +147,22 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
 
     def to_representation(self, instance):
+        if "ingredients" not in getattr(
+            instance, "_prefetched_objects_cache", {}
+        ):
+            prefetch_related_objects(
+                [instance], *RecipeQuerySet.related_lookups())
         data = super().to_representation(instance)
-        if self.context['view'].action == 'retrieve':
-            tags = Tag.objects.filter(id__in=data['tags'])
-            data['tags'] = TagSerializer(instance=tags, many=True).data
+        if getattr(self.context.get("view"), "action", None) == "retrieve":
+            data["tags"] = TagSerializer(
+                instance=instance.tags.all(), many=True).data
         return data
 
     def get_is_favorited(self, obj):
         if not self.context.get("request").user.is_authenticated:
             return False
+        if hasattr(obj, "is_favorited"):
+            return obj.is_favorited
         return Favorite.objects.filter(
             user=self.context.get("request").user, recipe=obj
         ).exists()
@@ -139,24 +170,44 @@ class RecipeSerializer(serializers.ModelSerializer):
     def get_is_in_shopping_cart(self, obj):
         if not self.context.get("request").user.is_authenticated:
             return False
+        if hasattr(obj, "is_in_shopping_cart"):
+            return obj.is_in_shopping_cart
         return ShoppingCartRecipe.objects.filter(
             user=self.context.get("request").user, recipe=obj
         ).exists()
 
     def set_tags_and_ingredients(self, recipe, tags, ingredients):
         recipe.tags.set(tags)
-        IngredientRecipe.objects.filter(recipe=recipe).delete()
-        ingredients_data = []
-        for ingredient in ingredients:
-            ingredient_data = IngredientRecipeSerializer(ingredient).data
-            ingredients_data.append(IngredientRecipe(
-                amount=ingredient_data["amount"],
-                ingredient=get_object_or_404(
-                    Ingredient, pk=ingredient_data["id"]),
-                recipe=recipe
-            ))
-        IngredientRecipe.objects.bulk_create(ingredients_data)
+        amounts = {
+            item["ingredient"]["id"]: item["amount"] for item in ingredients
+        }
+        existing = {
+            item.ingredient_id: item
+            for item in IngredientRecipe.objects.filter(recipe=recipe)
+        }
+        old_amounts = {
+            ingredient_id: item.amount
+            for ingredient_id, item in existing.items()
+        }
+        IngredientRecipe.objects.filter(
+            recipe=recipe, ingredient_id__in=existing.keys() - amounts.keys()
+        ).delete()
+        changed = []
+        for ingredient_id, item in existing.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and amount != item.amount:
+                item.amount = amount
+                changed.append(item)
+        IngredientRecipe.objects.bulk_update(changed, ["amount"])
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(
+                recipe=recipe, ingredient_id=ingredient_id, amount=amount)
+            for ingredient_id, amount in amounts.items()
+            if ingredient_id not in existing
+        )
+        return old_amounts, amounts
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop("ingredients")
         tags = validated_data.pop("tags")
@@ -164,11 +215,21 @@ class RecipeSerializer(serializers.ModelSerializer):
         self.set_tags_and_ingredients(recipe, tags, ingredients)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients = validated_data.pop("ingredients")
         tags = validated_data.pop("tags")
         super().update(instance, validated_data)
-        self.set_tags_and_ingredients(instance, tags, ingredients)
+        with cart_receivers_disabled():
+            old_amounts, new_amounts = self.set_tags_and_ingredients(
+                instance, tags, ingredients)
+        ShoppingCartIngredient.objects.add_recipe_amounts(instance.id, {
+            ingredient_id: (
+                new_amounts.get(ingredient_id, 0)
+                - old_amounts.get(ingredient_id, 0)
+            )
+            for ingredient_id in old_amounts.keys() | new_amounts.keys()
+        })
         return instance
 
     def validate(self, data):
@@ -182,19 +243,32 @@ class RecipeSerializer(serializers.ModelSerializer):
         if ingredients == []:
             raise serializers.ValidationError(
                 "Рецепт не может быть без ингредиентов")
-        ingredients_id = []
+        ingredients_id = set()
         for ingredient in ingredients:
-            ingredient_data = IngredientRecipeSerializer(ingredient).data
-            if ingredient_data["id"] in ingredients_id:
+            if ingredient["ingredient"]["id"] in ingredients_id:
                 raise serializers.ValidationError(
                     "Ингредиенты в рецепте не должны повторятся")
-            if ingredient_data["amount"] <= 0:
+            if ingredient["amount"] <= 0:
                 raise serializers.ValidationError(
                     "Количество ингредиента должно быть больше нуля")
-            ingredients_id.append(ingredient_data["id"])
+            ingredients_id.add(ingredient["ingredient"]["id"])
+        unknown = ingredients_id - Ingredient.objects.in_bulk(
+            ingredients_id).keys()
+        if unknown:
+            raise serializers.ValidationError({
+                "ingredients": "Ингредиенты не найдены: " + ", ".join(
+                    map(str, sorted(unknown)))
+            })
         return data
 
 
+class RecipeCoverageSerializer(RecipeSerializer):
+    coverage = serializers.FloatField(read_only=True)
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ("coverage",)
+
+
 class SubscribeSerializer(serializers.ModelSerializer):
     email = serializers.ReadOnlyField(source="subscribed_to.email")
     id = serializers.ReadOnlyField(source="subscribed_to.id")
@@ -204,7 +278,7 @@ class SubscribeSerializer(serializers.ModelSerializer):
     recipes = RecipeSerializer(
         source="subscribed_to.recipes", read_only=True, many=True)
     recipes_count = serializers.ReadOnlyField(
-        source="subscribed_to.recipes.count")
+        source="subscribed_to.recipes_count")
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -220,9 +294,6 @@ class SubscribeSerializer(serializers.ModelSerializer):
             "is_subscribed",
         )
 
-    def get_recipes_count(self, obj):
-        return obj.subscribed_to.recipes.count()
-
     def validate(self, data):
         subscribed_to_id = self.context["view"].kwargs.get("user_id")
         subscribed_to = get_object_or_404(User, pk=subscribed_to_id)
@@ -240,21 +311,29 @@ class SubscribeSerializer(serializers.ModelSerializer):
         return data
 
     def get_is_subscribed(self, obj):
-        return Subscription.objects.filter(
-            subscribed_to=obj.subscribed_to,
-            subscriber=self.context.get("request").user,
-        ).exists()
+        return obj.subscribed_to_id in get_subscribed_ids(
+            self.context.get("request"))
 
 
 class FavoriteSerializer(serializers.ModelSerializer):
     name = serializers.ReadOnlyField(source="recipe.name")
     id = serializers.ReadOnlyField(source="recipe.id")
     image = ImageBase64(source="recipe.image", read_only=True)
+    image_thumb = ImageVariant("thumb", source="recipe")
+    image_thumb_webp = ImageVariant(
+        "thumb", webp=True, source="recipe")
     cooking_time = serializers.ReadOnlyField(source="recipe.cooking_time")
 
     class Meta:
         model = Favorite
-        fields = ("id", "name", "image", "cooking_time")
+        fields = (
+            "id",
+            "name",
+            "image",
+            "image_thumb",
+            "image_thumb_webp",
+            "cooking_time",
+        )
 
     def validate(self, data):
         recipe_id = self.context["view"].kwargs.get("recipe_id")
@@ -268,15 +347,47 @@ class FavoriteSerializer(serializers.ModelSerializer):
         return data
 
 
+class SimilarRecipeSerializer(serializers.ModelSerializer):
+    id = serializers.ReadOnlyField(source="similar.id")
+    name = serializers.ReadOnlyField(source="similar.name")
+    image = ImageBase64(source="similar.image", read_only=True)
+    image_thumb = ImageVariant("thumb", source="similar")
+    image_thumb_webp = ImageVariant(
+        "thumb", webp=True, source="similar")
+    cooking_time = serializers.ReadOnlyField(source="similar.cooking_time")
+
+    class Meta:
+        model = SimilarRecipe
+        fields = (
+            "id",
+            "name",
+            "image",
+            "image_thumb",
+            "image_thumb_webp",
+            "cooking_time",
+            "score",
+        )
+
+
 class ShoppingCartSerializer(serializers.ModelSerializer):
     name = serializers.ReadOnlyField(source="recipe.name")
     id = serializers.ReadOnlyField(source="recipe.id")
     image = ImageBase64(source="recipe.image", read_only=True)
+    image_thumb = ImageVariant("thumb", source="recipe")
+    image_thumb_webp = ImageVariant(
+        "thumb", webp=True, source="recipe")
     cooking_time = serializers.ReadOnlyField(source="recipe.cooking_time")
 
     class Meta:
         model = ShoppingCartRecipe
-        fields = ("id", "name", "image", "cooking_time")
+        fields = (
+            "id",
+            "name",
+            "image",
+            "image_thumb",
+            "image_thumb_webp",
+            "cooking_time",
+        )
 
     def validate(self, data):
         recipe_id = self.context["view"].kwargs.get("recipe_id")
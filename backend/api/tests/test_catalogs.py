@@ -0,0 +1,40 @@
+def test_ingredient_autocomplete_skips_database_when_warm(
+    client, ingredients, django_assert_num_queries
+):
+    assert client.get("/api/ingredients/?name=ингр").status_code == 200
+    with django_assert_num_queries(0):
+        response = client.get("/api/ingredients/?name=ингредиент 1")
+    assert [item["name"] for item in response.json()] == [
+        "Ингредиент 1"]
+
+
+def test_ingredient_autocomplete_sees_new_ingredients(client, ingredients):
+    client.get("/api/ingredients/?name=ингр")
+    ingredients[0].name = "Ингредиент новый"
+    ingredients[0].save()
+    response = client.get("/api/ingredients/?name=ингредиент н")
+    assert [item["name"] for item in response.json()] == ["Ингредиент новый"]
+
+
+def test_tag_catalog_revalidation_skips_database(
+    client, tags, django_assert_num_queries
+):
+    etag = client.get("/api/tags/")["ETag"]
+    with django_assert_num_queries(0):
+        response = client.get("/api/tags/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    with django_assert_num_queries(0):
+        response = client.get("/api/tags/")
+    assert response.status_code == 200
+    assert response["ETag"] == etag
+    assert len(response.json()) == len(tags)
+
+
+def test_tag_catalog_etag_changes_after_write(client, tags):
+    etag = client.get("/api/tags/")["ETag"]
+    tags[0].name = "Новый тег"
+    tags[0].save()
+    response = client.get("/api/tags/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert "Новый тег" in [tag["name"] for tag in response.json()]
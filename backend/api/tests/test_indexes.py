@@ -0,0 +1,108 @@
+import pytest
+
+from api.indexes import RecipeIngredientIndex
+from recipes.models import IngredientRecipe, Recipe
+
+
+def expected_order(ingredient_ids):
+    found = []
+    for recipe in Recipe.objects.all():
+        own = set(recipe.ingredients.values_list("ingredient_id", flat=True))
+        matched = len(own & set(ingredient_ids))
+        if matched:
+            found.append((-matched / len(own), -recipe.id, recipe.id))
+    return [recipe_id for *_, recipe_id in sorted(found)]
+
+
+def search(index, state, ingredient_ids):
+    index.state = state
+    index.load = lambda: index.state
+    recipe_ids, _ = index.search(ingredient_ids)
+    return recipe_ids.tolist()
+
+
+@pytest.fixture
+def ingredient_ids(ingredients):
+    return [ingredients[i].id for i in (0, 1, 2, 5)]
+
+
+def test_build_indexes_every_recipe(recipes, ingredient_ids):
+    index = RecipeIngredientIndex()
+    state = index.build("v1")
+    assert sorted(state.recipe_ids.tolist()) == sorted(r.id for r in recipes)
+    assert state.alive.all()
+    assert search(index, state, ingredient_ids) == expected_order(
+        ingredient_ids)
+
+
+def test_build_skips_recipes_committed_after_the_recipe_list(
+    user, recipes, ingredients, ingredient_ids, monkeypatch
+):
+    index = RecipeIngredientIndex()
+    load_pairs = index.load_pairs
+
+    def load_pairs_after_insert(queryset):
+        late = Recipe.objects.create(
+            author=user, name="Поздний", image="recipes/test.png",
+            cooking_time=5)
+        IngredientRecipe.objects.create(
+            recipe=late, ingredient=ingredients[0], amount=1)
+        return load_pairs(queryset)
+
+    monkeypatch.setattr(index, "load_pairs", load_pairs_after_insert)
+    state = index.build("v1")
+    assert len(state.recipe_ids) == len(recipes)
+    assert set(search(index, state, ingredient_ids)) <= {
+        recipe.id for recipe in recipes}
+
+
+def test_refresh_picks_up_edits_and_deletes(
+    recipes, ingredients, ingredient_ids
+):
+    index = RecipeIngredientIndex()
+    state = index.build("v1")
+    edited = recipes[3]
+    IngredientRecipe.objects.filter(recipe=edited).delete()
+    IngredientRecipe.objects.create(
+        recipe=edited, ingredient=ingredients[0], amount=1)
+    edited.save()
+    recipes[4].delete()
+    state = index.refresh(state, "v2")
+    assert state.version == "v2"
+    assert recipes[4].id not in state.recipe_ids[state.alive].tolist()
+    assert search(index, state, ingredient_ids) == expected_order(
+        ingredient_ids)
+
+
+def test_refresh_adds_recipes_with_old_updated_at(
+    recipes, ingredients, ingredient_ids
+):
+    index = RecipeIngredientIndex()
+    state = index.build("v1")
+    imported = Recipe.objects.create(
+        author=recipes[0].author, name="Импорт", image="recipes/test.png",
+        cooking_time=5)
+    IngredientRecipe.objects.create(
+        recipe=imported, ingredient=ingredients[5], amount=1)
+    Recipe.objects.filter(pk=imported.pk).update(
+        updated_at=state.synced_at.replace(year=2000))
+    state = index.refresh(state, "v2")
+    assert search(index, state, ingredient_ids)[0] == imported.id
+    assert search(index, state, ingredient_ids) == expected_order(
+        ingredient_ids)
+
+
+def test_from_ingredients_orders_by_coverage(
+    user_client, recipes, ingredient_ids, monkeypatch
+):
+    monkeypatch.setattr(
+        "api.views.recipe_ingredient_index", RecipeIngredientIndex())
+    response = user_client.get(
+        "/api/recipes/from_ingredients/?limit=20&ingredients="
+        + ",".join(map(str, ingredient_ids)))
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [recipe["id"] for recipe in results] == expected_order(
+        ingredient_ids)
+    coverage = [recipe["coverage"] for recipe in results]
+    assert coverage == sorted(coverage, reverse=True)
@@ -0,0 +1,59 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.filters import RecipeFilterBackend
+from recipes.models import Recipe
+
+RECIPE_LIST_QUERIES = 5
+DISTINCT_STEPS = ("USE TEMP B-TREE FOR DISTINCT", "Unique", "HashAggregate")
+
+
+@pytest.mark.parametrize("limit", [5, 10])
+def test_recipe_list_query_count_does_not_depend_on_limit(
+    user_client, recipes, django_assert_num_queries, limit
+):
+    with django_assert_num_queries(RECIPE_LIST_QUERIES):
+        response = user_client.get(f"/api/recipes/?limit={limit}")
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == limit
+
+
+@pytest.mark.parametrize("slugs", [["tag0", "tag1"], ["tag1", "tag2"]])
+def test_recipe_list_filters_by_several_tags_without_distinct(
+    user_client, recipes, slugs
+):
+    expected = {
+        recipe.id for recipe in recipes
+        if recipe.tags.filter(slug__in=slugs).exists()
+    }
+    response = user_client.get(
+        "/api/recipes/", {"tags": slugs, "limit": 20})
+    assert response.status_code == 200
+    data = response.json()
+    ids = [recipe["id"] for recipe in data["results"]]
+    assert data["count"] == len(expected)
+    assert len(ids) == len(set(ids))
+    assert set(ids) == expected
+    request = Request(
+        APIRequestFactory().get("/api/recipes/", {"tags": slugs}))
+    queryset = RecipeFilterBackend().filter_queryset(
+        request, Recipe.objects.all(), view=None)
+    plan = queryset.explain()
+    assert not any(step in plan for step in DISTINCT_STEPS), plan
+
+
+@pytest.mark.django_db(transaction=True)
+def test_recipe_etag_ignores_other_recipes_but_tracks_author(
+    client, recipes, user
+):
+    url = f"/api/recipes/{recipes[0].id}/"
+    etag = client.get(url)["ETag"]
+    recipes[1].name = "Другой рецепт"
+    recipes[1].save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    user.first_name = "Пётр"
+    user.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["author"]["first_name"] == "Пётр"
@@ -0,0 +1,80 @@
+import pytest
+from django.http import QueryDict
+
+from recipes.models import Favorite, Recipe
+from users.models import User
+
+
+@pytest.fixture
+def soups(user, tags):
+    other = User.objects.create_user(
+        email="chef@foodgram.local",
+        username="chef",
+        first_name="Пётр",
+        last_name="Кашеваров",
+        password="password-12345",
+    )
+    recipes = {}
+    for key, author, name, text, tag in (
+        ("borscht", user, "Борщ украинский", "Свёкла и капуста", tags[0]),
+        ("shchi", user, "Щи", "Почти как борщ, только без свёклы", tags[0]),
+        ("green", other, "Зелёный борщ", "Щавель и яйцо", tags[1]),
+        ("salad", other, "Винегрет", "Свёкла, огурцы и горошек", tags[1]),
+    ):
+        recipes[key] = Recipe.objects.create(
+            author=author,
+            name=name,
+            text=text,
+            image="recipes/test.png",
+            cooking_time=30,
+        )
+        recipes[key].tags.set([tag])
+    Favorite.objects.create(user=user, recipe=recipes["green"])
+    return recipes
+
+
+def result_ids(client, query):
+    response = client.get("/api/recipes/", QueryDict(query))
+    assert response.status_code == 200
+    return [recipe["id"] for recipe in response.json()["results"]]
+
+
+def test_full_text_search_ranks_name_matches_first(user_client, soups):
+    ids = result_ids(user_client, "q=борщ")
+    assert set(ids[:2]) == {soups["borscht"].id, soups["green"].id}
+    assert ids[2:] == [soups["shchi"].id]
+
+
+def test_full_text_search_matches_word_prefixes(user_client, soups):
+    assert set(result_ids(user_client, "q=свёк")) == {
+        soups["borscht"].id, soups["shchi"].id, soups["salad"].id}
+    assert result_ids(user_client, "q=БОР укр") == [soups["borscht"].id]
+
+
+def test_full_text_search_without_words_returns_nothing(user_client, soups):
+    assert result_ids(user_client, "q=%2B%2B") == []
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("q=борщ&tags=tag0", ["borscht", "shchi"]),
+        ("q=борщ&tags=tag1", ["green"]),
+        ("q=свёкла&author={other}", ["salad"]),
+        ("q=борщ&is_favorited=1", ["green"]),
+        ("q=борщ&is_favorited=1&tags=tag0", []),
+    ],
+)
+def test_full_text_search_combines_with_filters(
+    user_client, soups, query, expected
+):
+    query = query.format(other=soups["salad"].author_id)
+    assert result_ids(user_client, query) == [
+        soups[key].id for key in expected]
+
+
+def test_name_search_folds_cyrillic_case(user_client, soups):
+    expected = {soups["borscht"].id, soups["green"].id}
+    assert set(result_ids(user_client, "search=БОРЩ")) == expected
+    assert set(result_ids(user_client, "search=борщ")) == expected
+    assert result_ids(user_client, "search=ЗЕЛЁНЫЙ") == [soups["green"].id]
@@ -0,0 +1,88 @@
+import pytest
+from django.db.models import Sum
+
+from recipes.models import (Ingredient, IngredientRecipe,
+                            ShoppingCartIngredient, ShoppingCartRecipe)
+from users.models import User
+
+RECIPE_UPDATE_QUERIES = 23
+
+
+@pytest.fixture
+def shoppers(recipes):
+    shoppers = [
+        User.objects.create_user(
+            email=f"shopper{i}@foodgram.local",
+            username=f"shopper{i}",
+            first_name="Анна",
+            last_name="Покупкина",
+            password="password-12345",
+        )
+        for i in range(3)
+    ]
+    for shopper in shoppers:
+        for recipe in recipes[:2]:
+            ShoppingCartRecipe.objects.create(user=shopper, recipe=recipe)
+    return shoppers
+
+
+def live_totals():
+    totals = {}
+    for user_id, recipe_id in ShoppingCartRecipe.objects.values_list(
+        "user_id", "recipe_id"
+    ):
+        for ingredient_id, amount in IngredientRecipe.objects.filter(
+            recipe_id=recipe_id
+        ).values_list("ingredient_id", "amount"):
+            key = (user_id, ingredient_id)
+            totals[key] = totals.get(key, 0) + amount
+    return totals
+
+
+def stored_totals():
+    return {
+        (user_id, ingredient_id): total
+        for user_id, ingredient_id, total
+        in ShoppingCartIngredient.objects.values_list(
+            "user_id", "ingredient_id", "total_amount")
+    }
+
+
+@pytest.mark.parametrize("count", [10, 30])
+def test_recipe_update_applies_cart_difference_in_constant_queries(
+    user_client, recipes, ingredients, tags, shoppers,
+    django_assert_num_queries, count,
+):
+    extra = [
+        Ingredient.objects.create(name=f"Добавка {i}", measurement_unit="г")
+        for i in range(count)
+    ]
+    recipe = recipes[0]
+    kept = IngredientRecipe.objects.filter(recipe=recipe).first()
+    payload = {
+        "name": "Новое название",
+        "text": "Новое описание",
+        "cooking_time": 15,
+        "tags": [tags[0].id],
+        "ingredients": [{"id": kept.ingredient_id, "amount": 100}] + [
+            {"id": ingredient.id, "amount": i + 1}
+            for i, ingredient in enumerate(extra)
+        ],
+    }
+    with django_assert_num_queries(RECIPE_UPDATE_QUERIES):
+        response = user_client.patch(
+            f"/api/recipes/{recipe.id}/", payload, format="json")
+    assert response.status_code == 200
+    assert IngredientRecipe.objects.filter(recipe=recipe).aggregate(
+        total=Sum("amount"))["total"] == 100 + count * (count + 1) // 2
+    assert stored_totals() == live_totals()
+
+
+def test_orm_edits_update_cart_totals(recipes, ingredients, shoppers):
+    item = IngredientRecipe.objects.filter(recipe=recipes[0]).first()
+    item.amount += 5
+    item.save()
+    IngredientRecipe.objects.create(
+        recipe=recipes[1], ingredient=ingredients[9], amount=7)
+    IngredientRecipe.objects.filter(recipe=recipes[1]).first().delete()
+    assert stored_totals() == live_totals()
@@ -0,0 +1,33 @@
+import pytest
+from rest_framework.test import APIClient
+
+from users.models import User
+
+
+@pytest.fixture
+def follower_client(db):
+    follower = User.objects.create_user(
+        email="reader@foodgram.local",
+        username="reader",
+        first_name="Анна",
+        last_name="Читателева",
+        password="password-12345",
+    )
+    client = APIClient()
+    client.force_authenticate(follower)
+    return client
+
+
+@pytest.mark.parametrize(
+    "recipes_limit, expected", [("3", 3), ("abc", 12), ("-1", 12), ("", 12)])
+def test_recipes_limit_ignores_invalid_values(
+    follower_client, user, recipes, recipes_limit, expected
+):
+    response = follower_client.post(
+        f"/api/users/{user.id}/subscribe/?recipes_limit={recipes_limit}")
+    assert response.status_code == 201
+    assert len(response.json()["recipes"]) == expected
+    response = follower_client.get(
+        "/api/users/subscriptions/", {"recipes_limit": recipes_limit})
+    assert response.status_code == 200
+    assert len(response.json()["results"][0]["recipes"]) == expected
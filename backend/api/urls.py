@@ -1,10 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
-from api.views import (FavoriteApiView, IngredientViewSet, RecipeViewSet,
-                       ShoppingCartApiView, SubscribeApiView,
-                       SubscribeListApiView, TagViewSet,
-                       download_shopping_cart)
+from api.views import (DownloadShoppingCartApiView, FavoriteApiView,
+                       IngredientViewSet, RecipeViewSet, ShoppingCartApiView,
+                       SubscribeApiView, SubscribeListApiView, TagViewSet)
 
 router_v1 = SimpleRouter()
 router_v1.register("tags", TagViewSet)
@@ -18,7 +17,8 @@ urlpatterns = [
     path("recipes/<int:recipe_id>/favorite/", FavoriteApiView.as_view()),
     path("recipes/<int:recipe_id>/shopping_cart/",
          ShoppingCartApiView.as_view()),
-    path("recipes/download_shopping_cart/", download_shopping_cart),
+    path("recipes/download_shopping_cart/",
+         DownloadShoppingCartApiView.as_view()),
     path("", include("djoser.urls")),
     path("", include(router_v1.urls)),
 ]
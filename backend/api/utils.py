@@ -1,6 +1,72 @@
+import csv
+import hashlib
+import io
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from recipes.versions import INGREDIENTS, TAGS, get_versions, user_version_name
+
+PDF_FONT_NAME = "ShoppingCartFont"
+PDF_FONT_SIZE = 12
+PDF_MARGIN = 50
+PDF_LINE_HEIGHT = 18
+
+
+def get_subscribed_ids(request):
+    if not hasattr(request, "subscribed_ids"):
+        request.subscribed_ids = set(
+            request.user.subscribed_to.values_list(
+                "subscribed_to_id", flat=True)
+        )
+    return request.subscribed_ids
+
+
+def recipe_validators(request, updated_at, author_id):
+    names = [TAGS, INGREDIENTS, user_version_name(author_id)]
+    state = [updated_at.isoformat()]
+    if request.user.is_authenticated:
+        names.append(user_version_name(request.user.id))
+        state.append(str(request.user.id))
+    state += get_versions(*names)
+    return '"{}"'.format(hashlib.md5(":".join(state).encode()).hexdigest())
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
 def create_shopping_cart(ingredient_list):
-    shopping_cart = "\n".join(
-        f" - {name.title()} ({measurement_unit}) -> {total_amount} "
-        for name, total_amount, measurement_unit in ingredient_list
-    )
-    return shopping_cart
+    for name, total_amount, measurement_unit in ingredient_list:
+        yield f" - {name.title()} ({measurement_unit}) -> {total_amount} \n"
+
+
+def create_shopping_cart_csv(ingredient_list):
+    writer = csv.writer(Echo())
+    yield writer.writerow(("Ингредиент", "Количество", "Единица измерения"))
+    for name, total_amount, measurement_unit in ingredient_list:
+        yield writer.writerow((name, total_amount, measurement_unit))
+
+
+def create_shopping_cart_pdf(ingredient_list):
+    if PDF_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(
+            TTFont(PDF_FONT_NAME, settings.SHOPPING_CART_PDF_FONT))
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    y = height - PDF_MARGIN
+    pdf.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+    for line in create_shopping_cart(ingredient_list):
+        if y < PDF_MARGIN:
+            pdf.showPage()
+            pdf.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+            y = height - PDF_MARGIN
+        pdf.drawString(PDF_MARGIN, y, line.rstrip())
+        y -= PDF_LINE_HEIGHT
+    pdf.save()
+    yield buffer.getvalue()
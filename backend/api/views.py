@@ -1,51 +1,159 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
-from django.http import Http404, HttpResponse
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
 from rest_framework import generics, status, viewsets
-from rest_framework.decorators import api_view
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import action
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from api.filters import IngredientSearchFilter, RecipeFilterBackend
-from api.generics import CreateDeleteAPIView
+from api.filters import RecipeFilterBackend
+from api.generics import CachedCatalogMixin, CreateDeleteAPIView
+from api.indexes import ingredient_index, recipe_ingredient_index
+from api.negotiation import FallbackContentNegotiation
+from api.pagination import (FeedPagination, RecipePagination,
+                            SubscriptionPagination)
 from api.permissions import RecipePermission
+from api.renderers import CSVRenderer, PDFRenderer, PlainTextRenderer
 from api.serializers import (FavoriteSerializer, IngredientSerializer,
-                             RecipeSerializer, ShoppingCartSerializer,
+                             RecipeCoverageSerializer, RecipeSerializer,
+                             ShoppingCartSerializer, SimilarRecipeSerializer,
                              SubscribeSerializer, TagSerializer)
-from api.utils import create_shopping_cart
-from recipes.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
-                            ShoppingCartRecipe, Tag)
+from api.utils import (create_shopping_cart, create_shopping_cart_csv,
+                       create_shopping_cart_pdf, recipe_validators)
+from recipes.models import (Favorite, Ingredient, Recipe,
+                            ShoppingCartIngredient, ShoppingCartRecipe,
+                            SimilarRecipe, Tag, TimelineEntry)
+from recipes.versions import INGREDIENTS, RECIPES, TAGS
 from users.models import Subscription
 
 User = get_user_model()
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+def subscribed_recipes_prefetch(user, recipes_limit=""):
+    queryset = Recipe.objects.with_related().with_user_flags(user)
+    if recipes_limit.isdigit():
+        queryset = queryset.limited_per_author(int(recipes_limit))
+    return Prefetch("subscribed_to__recipes", queryset=queryset)
+
+
+class TagViewSet(CachedCatalogMixin, viewsets.ReadOnlyModelViewSet):
+    catalog = TAGS
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
     permission_classes = (AllowAny,)
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CachedCatalogMixin, viewsets.ReadOnlyModelViewSet):
+    catalog = INGREDIENTS
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     pagination_class = None
     permission_classes = (AllowAny,)
-    filter_backends = (IngredientSearchFilter,)
-    search_fields = ('name',)
+
+    def get_catalog(self, request, *args, **kwargs):
+        limit = request.query_params.get("limit")
+        return ingredient_index.search(
+            request.query_params.get("name", ""),
+            int(limit) if limit and limit.isdigit() else None,
+            self.catalog_version,
+        )
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(CachedCatalogMixin, viewsets.ModelViewSet):
+    catalog = RECIPES
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
     filter_backends = (RecipeFilterBackend,)
+    pagination_class = RecipePagination
     permission_classes = (RecipePermission,)
+    lookup_value_regex = r"\d+"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve", "feed", "from_ingredients"):
+            queryset = queryset.with_related()
+        return queryset.with_user_flags(self.request.user)
+
+    def use_catalog_cache(self, request):
+        return not request.user.is_authenticated
+
+    def retrieve(self, request, *args, **kwargs):
+        updated_at, author_id = get_object_or_404(
+            Recipe.objects.values_list("updated_at", "author_id"),
+            pk=kwargs["pk"],
+        )
+        etag = recipe_validators(request, updated_at, author_id)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        response["ETag"] = etag
+        return response
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @action(detail=False, permission_classes=(IsAuthenticated,))
+    def feed(self, request):
+        paginator = FeedPagination()
+        ids = paginator.paginate_feed(
+            request,
+            lambda limit, position: TimelineEntry.objects.feed(
+                request.user, limit, position),
+        )
+        recipes = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [recipes[pk] for pk in ids if pk in recipes], many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False)
+    def from_ingredients(self, request):
+        ingredient_ids = [
+            int(pk)
+            for value in request.query_params.getlist("ingredients")
+            for pk in value.split(",") if pk.strip().isdigit()
+        ]
+        if not ingredient_ids:
+            return Response(
+                {"ingredients": "Укажите хотя бы один ингредиент"},
+                status.HTTP_400_BAD_REQUEST,
+            )
+        recipe_ids, coverage = recipe_ingredient_index.search(ingredient_ids)
+        paginator = LimitOffsetPagination()
+        positions = paginator.paginate_queryset(
+            range(len(recipe_ids)), request, view=self)
+        recipes = self.get_queryset().in_bulk(recipe_ids[positions].tolist())
+        page = []
+        for position in positions:
+            recipe = recipes.get(int(recipe_ids[position]))
+            if recipe is not None:
+                recipe.coverage = float(coverage[position])
+                page.append(recipe)
+        serializer = RecipeCoverageSerializer(
+            page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        queryset = (
+            SimilarRecipe.objects.filter(recipe_id=pk)
+            .select_related("similar")
+            .order_by("-score")
+        )
+        limit = request.query_params.get("limit", "")
+        if limit.isdigit():
+            queryset = queryset[:int(limit)]
+        similar = list(queryset)
+        if not similar:
+            get_object_or_404(Recipe, pk=pk)
+        return Response(SimilarRecipeSerializer(
+            similar, many=True, context=self.get_serializer_context()).data)
+
 
 class SubscribeApiView(CreateDeleteAPIView):
     queryset = Subscription.objects.all()
@@ -55,6 +163,13 @@ class SubscribeApiView(CreateDeleteAPIView):
         subscribed_to = get_object_or_404(User, pk=self.kwargs.get("user_id"))
         serializer.save(
             subscriber=self.request.user, subscribed_to=subscribed_to)
+        prefetch_related_objects(
+            [serializer.instance],
+            subscribed_recipes_prefetch(
+                self.request.user,
+                self.request.query_params.get("recipes_limit", "")
+            ),
+        )
 
     def delete(self, request, *args, **kwargs):
         subscribed_to = get_object_or_404(User, pk=self.kwargs.get("user_id"))
@@ -76,9 +191,16 @@ class SubscribeApiView(CreateDeleteAPIView):
 class SubscribeListApiView(generics.ListAPIView):
     queryset = Subscription.objects.all()
     serializer_class = SubscribeSerializer
+    pagination_class = SubscriptionPagination
 
     def get_queryset(self):
-        return self.request.user.subscribed_to.all()
+        return (
+            self.request.user.subscribed_to.select_related("subscribed_to")
+            .prefetch_related(subscribed_recipes_prefetch(
+                self.request.user,
+                self.request.query_params.get("recipes_limit", "")
+            ))
+        )
 
 
 class FavoriteApiView(CreateDeleteAPIView):
@@ -110,6 +232,7 @@ class ShoppingCartApiView(CreateDeleteAPIView):
     queryset = ShoppingCartRecipe.objects.all()
     serializer_class = ShoppingCartSerializer
 
+    @transaction.atomic
     def perform_create(self, serializer):
         recipe = get_object_or_404(Recipe, pk=self.kwargs.get("recipe_id"))
         serializer.save(user=self.request.user, recipe=recipe)
@@ -127,22 +250,42 @@ class ShoppingCartApiView(CreateDeleteAPIView):
                 {"errors": "Рецепт не добавлен в список покупок"},
                 status.HTTP_400_BAD_REQUEST,
             )
-        super().perform_destroy(instance)
+        with transaction.atomic():
+            super().perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-@api_view(["GET"])
-def download_shopping_cart(request):
-    ingredient_list = (
-        IngredientRecipe.objects.filter(
-            recipe__in_shopping_carts__user=request.user)
-        .values("ingredient__name")
-        .annotate(total_amount=Sum("amount"))
-        .values_list(
-            "ingredient__name", "total_amount", "ingredient__measurement_unit")
-    )
-
-    response = HttpResponse(
-        create_shopping_cart(ingredient_list), content_type="text/plain")
-    response["Content-Disposition"] = "attachment; filename=shopping_list.txt"
-    return response
+SHOPPING_CART_FORMATS = {
+    "txt": create_shopping_cart,
+    "csv": create_shopping_cart_csv,
+    "pdf": create_shopping_cart_pdf,
+}
+
+
+class DownloadShoppingCartApiView(APIView):
+    renderer_classes = (PlainTextRenderer, CSVRenderer, PDFRenderer)
+    content_negotiation_class = FallbackContentNegotiation
+
+    def get(self, request):
+        ingredient_list = (
+            ShoppingCartIngredient.objects.filter(user=request.user)
+            .values_list(
+                "ingredient__name",
+                "total_amount",
+                "ingredient__measurement_unit",
+            )
+            .order_by("ingredient__name")
+            .iterator()
+        )
+
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f"; charset={renderer.charset}"
+        response = StreamingHttpResponse(
+            SHOPPING_CART_FORMATS[renderer.format](ingredient_list),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = (
+            f"attachment; filename=shopping_list.{renderer.format}")
+        return response
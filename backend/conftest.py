@@ -0,0 +1,76 @@
+import pytest
+from rest_framework.test import APIClient
+
+from recipes import versions
+from recipes.models import Favorite, Ingredient, IngredientRecipe, Recipe, Tag
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture(autouse=True)
+def local_versions():
+    versions.local_versions.clear()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        email="cook@foodgram.local",
+        username="cook",
+        first_name="Иван",
+        last_name="Поваров",
+        password="password-12345",
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def tags(db):
+    return [
+        Tag.objects.create(name=f"Тег {i}", color=f"#00000{i}", slug=f"tag{i}")
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def ingredients(db):
+    return [
+        Ingredient.objects.create(name=f"Ингредиент {i}", measurement_unit="г")
+        for i in range(10)
+    ]
+
+
+@pytest.fixture
+def recipes(user, tags, ingredients):
+    recipes = []
+    for i in range(12):
+        recipe = Recipe.objects.create(
+            author=user,
+            name=f"Рецепт {i}",
+            text="Описание",
+            image="recipes/test.png",
+            cooking_time=10,
+        )
+        recipe.tags.set([tags[i % 3], tags[(i + 1) % 3]])
+        IngredientRecipe.objects.bulk_create([
+            IngredientRecipe(
+                recipe=recipe,
+                ingredient=ingredients[(i + j) % 10],
+                amount=j + 1,
+            )
+            for j in range(3)
+        ])
+        recipes.append(recipe)
+    Favorite.objects.bulk_create(
+        [Favorite(user=user, recipe=recipe) for recipe in recipes[::2]])
+    return recipes
@@ -32,6 +32,7 @@ INSTALLED_APPS = [
     "users.apps.UsersConfig",
     "recipes.apps.RecipesConfig",
     "api.apps.ApiConfig",
+    "jobs.apps.JobsConfig",
     "rest_framework",
     "djoser",
     "rest_framework.authtoken",
@@ -82,6 +83,16 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", default="foodgram"),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -151,3 +162,32 @@ AUTH_USER_MODEL = "users.User"
 MEDIA_URL = "/media/"
 
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
+RECIPE_IMAGE_MAX_SIZE = int(
+    os.getenv("RECIPE_IMAGE_MAX_SIZE", default=5 * 1024 * 1024))
+
+RECIPE_IMAGE_MAX_DIMENSION = int(
+    os.getenv("RECIPE_IMAGE_MAX_DIMENSION", default=2048))
+
+RECIPE_IMAGE_VARIANTS = {
+    "thumb": 320,
+    "medium": 640,
+}
+
+FEED_FANOUT_LIMIT = int(os.getenv("FEED_FANOUT_LIMIT", default=1000))
+
+FEED_BACKFILL_SIZE = int(os.getenv("FEED_BACKFILL_SIZE", default=100))
+
+SIMILAR_RECIPES_TOP_K = int(os.getenv("SIMILAR_RECIPES_TOP_K", default=20))
+
+CACHE_VERSION_TTL = float(os.getenv("CACHE_VERSION_TTL", default=2))
+
+JOBS_EAGER = os.getenv("JOBS_EAGER", default="False") == "True"
+
+JOBS_HEARTBEAT_INTERVAL = int(
+    os.getenv("JOBS_HEARTBEAT_INTERVAL", default=30))
+
+SHOPPING_CART_PDF_FONT = os.getenv(
+    "SHOPPING_CART_PDF_FONT",
+    default="/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+)
@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from jobs.models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "name", "status", "attempts", "run_after", "created_at", "finished_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("last_error",)
+
+
+admin.site.register(Job, JobAdmin)
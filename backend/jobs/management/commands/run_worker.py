@@ -0,0 +1,104 @@
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.models import Job
+from jobs.queue import run_job
+
+
+class Command(BaseCommand):
+    help = "Обработчик фоновых задач"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Количество одновременно выполняемых задач",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=("thread", "process"),
+            default="thread",
+            help="Пул потоков или процессов",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Пауза между опросами пустой очереди, сек.",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=120,
+            help="Через сколько секунд без сигнала обработчика вернуть "
+                 "задачу в очередь",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=7,
+            help="Сколько дней хранить завершённые задачи",
+        )
+        parser.add_argument(
+            "--purge-interval",
+            type=int,
+            default=3600,
+            help="Как часто удалять старые завершённые задачи, сек.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выйти, когда очередь опустеет",
+        )
+
+    def handle(self, **options):
+        if options["pool"] == "process":
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=options["concurrency"], initializer=django.setup)
+        else:
+            executor = ThreadPoolExecutor(max_workers=options["concurrency"])
+        purged_at = None
+        running = {}
+        with executor:
+            while True:
+                if (
+                    purged_at is None
+                    or time.monotonic() - purged_at
+                    >= options["purge_interval"]
+                ):
+                    Job.objects.purge_finished(options["keep_days"])
+                    purged_at = time.monotonic()
+                Job.objects.requeue_stale(options["stale_after"])
+                self.submit(executor, running, options)
+                if not running:
+                    if options["once"]:
+                        return
+                    time.sleep(options["poll_interval"])
+                    continue
+                self.collect(running, options["poll_interval"])
+
+    def submit(self, executor, running, options):
+        free = options["concurrency"] - len(running)
+        if free <= 0:
+            return
+        job_ids = Job.objects.claim(free)
+        if job_ids and options["pool"] == "process":
+            connections.close_all()
+        for job_id in job_ids:
+            running[executor.submit(run_job, job_id)] = job_id
+
+    def collect(self, running, timeout):
+        done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            job_id = running.pop(future)
+            self.stdout.write(
+                f"Задача {job_id}: "
+                + ("выполнена" if future.result() else "ошибка")
+            )
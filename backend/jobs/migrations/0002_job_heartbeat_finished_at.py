@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:24
+
+from django.db import migrations, models
+
+
+def fill_timestamps(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.filter(status='running').update(
+        heartbeat_at=models.F('locked_at'))
+    Job.objects.filter(status__in=('done', 'failed')).update(
+        finished_at=models.F('run_after'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Завершена'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Последний сигнал обработчика'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'finished_at'], name='job_status_finished_at'),
+        ),
+        migrations.RunPython(fill_timestamps, migrations.RunPython.noop),
+    ]
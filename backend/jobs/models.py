@@ -0,0 +1,173 @@
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+STALE_ERROR = "Обработчик перестал отвечать"
+
+
+class JobQuerySet(models.QuerySet):
+    def claim(self, limit):
+        now = timezone.now()
+        candidates = self.filter(
+            status=Job.PENDING, run_after__lte=now
+        ).values_list("pk", flat=True)[:limit]
+        return [
+            pk for pk in candidates
+            if self.filter(pk=pk, status=Job.PENDING).update(
+                status=Job.RUNNING,
+                locked_at=now,
+                heartbeat_at=now,
+                attempts=models.F("attempts") + 1,
+            )
+        ]
+
+    def requeue_stale(self, timeout):
+        now = timezone.now()
+        stale = self.filter(
+            status=Job.RUNNING,
+            heartbeat_at__lt=now - timedelta(seconds=timeout),
+        )
+        stale.filter(attempts__gte=models.F("max_attempts")).update(
+            status=Job.FAILED,
+            locked_at=None,
+            heartbeat_at=None,
+            finished_at=now,
+            last_error=STALE_ERROR,
+        )
+        return stale.update(
+            status=Job.PENDING,
+            locked_at=None,
+            heartbeat_at=None,
+            last_error=STALE_ERROR,
+        )
+
+    def enqueue_once(self, name, arguments):
+        queued = self.filter(
+            status__in=(Job.PENDING, Job.RUNNING),
+            name=name,
+            arguments=arguments,
+        ).first()
+        if queued is not None:
+            return queued
+        return self.create(name=name, arguments=arguments)
+
+    def beat(self, pk):
+        return self.filter(pk=pk, status=Job.RUNNING).update(
+            heartbeat_at=timezone.now())
+
+    def purge_finished(self, days):
+        return self.filter(
+            status__in=(Job.DONE, Job.FAILED),
+            finished_at__lt=timezone.now() - timedelta(days=days),
+        ).delete()[0]
+
+
+class Job(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнена"),
+        (FAILED, "Ошибка"),
+    )
+
+    name = models.CharField(
+        max_length=200,
+        verbose_name="Функция"
+    )
+    arguments = models.TextField(
+        default="[]",
+        verbose_name="Аргументы"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name="Статус"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Попытки"
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=3,
+        verbose_name="Максимум попыток"
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Запустить после"
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Взята в работу"
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Последний сигнал обработчика"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Завершена"
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name="Последняя ошибка"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Создана"
+    )
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("run_after",)
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        indexes = [
+            models.Index(
+                fields=["status", "run_after"], name="job_status_run_after"
+            ),
+            models.Index(
+                fields=["status", "finished_at"],
+                name="job_status_finished_at",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def finish(self):
+        self.status = Job.DONE
+        self.locked_at = None
+        self.heartbeat_at = None
+        self.finished_at = timezone.now()
+        self.save(update_fields=(
+            "status", "locked_at", "heartbeat_at", "finished_at"))
+
+    def fail(self, error):
+        self.last_error = error
+        self.locked_at = None
+        self.heartbeat_at = None
+        if self.attempts >= self.max_attempts:
+            self.status = Job.FAILED
+            self.finished_at = timezone.now()
+        else:
+            self.status = Job.PENDING
+            self.run_after = timezone.now() + timedelta(
+                seconds=2 ** self.attempts)
+        self.save(update_fields=(
+            "last_error",
+            "locked_at",
+            "heartbeat_at",
+            "status",
+            "run_after",
+            "finished_at",
+        ))
@@ -0,0 +1,69 @@
+import json
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils.module_loading import import_string
+
+from jobs.models import Job
+
+
+def job(func):
+    name = f"{func.__module__}.{func.__name__}"
+
+    def delay(*args):
+        if settings.JOBS_EAGER:
+            return func(*args)
+        return Job.objects.create(name=name, arguments=json.dumps(args))
+
+    def delay_once(*args):
+        if settings.JOBS_EAGER:
+            return func(*args)
+        return Job.objects.enqueue_once(name, json.dumps(args))
+
+    func.delay = delay
+    func.delay_once = delay_once
+    func.is_job = True
+    return func
+
+
+class Heartbeat(threading.Thread):
+    def __init__(self, job_id):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(settings.JOBS_HEARTBEAT_INTERVAL):
+                Job.objects.beat(self.job_id)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job_id):
+    close_old_connections()
+    try:
+        instance = Job.objects.get(pk=job_id)
+        try:
+            func = import_string(instance.name)
+            if not getattr(func, "is_job", False):
+                raise ValueError(f"{instance.name} не является задачей")
+            heartbeat = Heartbeat(job_id)
+            heartbeat.start()
+            try:
+                func(*json.loads(instance.arguments))
+            finally:
+                heartbeat.stop()
+        except Exception:
+            instance.fail(traceback.format_exc())
+            return False
+        instance.finish()
+        return True
+    finally:
+        close_old_connections()
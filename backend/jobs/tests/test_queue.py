@@ -0,0 +1,117 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from jobs.models import STALE_ERROR, Job
+from jobs.queue import job, run_job
+
+CALLS = []
+
+
+@job
+def record(value):
+    CALLS.append(value)
+
+
+@job
+def explode():
+    raise RuntimeError("boom")
+
+
+def create_job(func, *args, **kwargs):
+    return Job.objects.create(
+        name=f"{func.__module__}.{func.__name__}",
+        arguments=json.dumps(args),
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_claim_takes_due_pending_jobs_up_to_limit():
+    due = [create_job(record, i) for i in range(3)]
+    later = create_job(
+        record, 9, run_after=timezone.now() + timedelta(hours=1))
+    claimed = Job.objects.claim(2)
+    assert claimed == [due[0].pk, due[1].pk]
+    assert Job.objects.claim(5) == [due[2].pk]
+    statuses = dict(Job.objects.values_list("pk", "status"))
+    assert statuses[later.pk] == Job.PENDING
+    assert all(statuses[item.pk] == Job.RUNNING for item in due)
+    assert set(Job.objects.filter(status=Job.RUNNING).values_list(
+        "attempts", flat=True)) == {1}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_job_finishes_successful_job():
+    item = create_job(record, "ok")
+    Job.objects.claim(1)
+    assert run_job(item.pk)
+    item.refresh_from_db()
+    assert CALLS[-1] == "ok"
+    assert item.status == Job.DONE
+    assert item.finished_at is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_job_retries_with_backoff_then_fails():
+    item = create_job(explode, max_attempts=2)
+    Job.objects.claim(1)
+    before = timezone.now()
+    assert not run_job(item.pk)
+    item.refresh_from_db()
+    assert item.status == Job.PENDING
+    assert "boom" in item.last_error
+    assert item.run_after >= before + timedelta(seconds=2)
+    Job.objects.filter(pk=item.pk).update(run_after=timezone.now())
+    assert Job.objects.claim(1) == [item.pk]
+    assert not run_job(item.pk)
+    item.refresh_from_db()
+    assert item.status == Job.FAILED
+    assert item.attempts == 2
+    assert item.finished_at is not None
+
+
+@pytest.mark.django_db
+def test_requeue_stale_respects_heartbeat_and_max_attempts():
+    stale, fresh, exhausted = (
+        create_job(record, i, max_attempts=2) for i in range(3))
+    Job.objects.claim(3)
+    Job.objects.filter(pk=exhausted.pk).update(attempts=2)
+    Job.objects.filter(pk__in=[stale.pk, exhausted.pk]).update(
+        heartbeat_at=timezone.now() - timedelta(minutes=10))
+    assert Job.objects.requeue_stale(120) == 1
+    statuses = dict(Job.objects.values_list("pk", "status"))
+    assert statuses == {
+        stale.pk: Job.PENDING,
+        fresh.pk: Job.RUNNING,
+        exhausted.pk: Job.FAILED,
+    }
+    assert Job.objects.get(pk=exhausted.pk).last_error == STALE_ERROR
+
+
+@pytest.mark.django_db
+def test_purge_finished_deletes_only_old_finished_jobs():
+    old_done = create_job(record, 1, status=Job.DONE)
+    old_failed = create_job(record, 2, status=Job.FAILED)
+    recent = create_job(
+        record, 3, status=Job.DONE, finished_at=timezone.now())
+    pending = create_job(record, 4)
+    Job.objects.filter(pk__in=[old_done.pk, old_failed.pk]).update(
+        finished_at=timezone.now() - timedelta(days=8))
+    assert Job.objects.purge_finished(7) == 2
+    assert set(Job.objects.values_list("pk", flat=True)) == {
+        recent.pk, pending.pk}
+
+
+@pytest.mark.django_db
+def test_delay_once_reuses_queued_job():
+    first = record.delay_once(1)
+    assert record.delay_once(1) == first
+    Job.objects.filter(pk=first.pk).update(status=Job.RUNNING)
+    assert record.delay_once(1) == first
+    other = record.delay_once(2)
+    Job.objects.filter(pk=first.pk).update(status=Job.DONE)
+    again = record.delay_once(1)
+    assert len({first.pk, other.pk, again.pk}) == 3
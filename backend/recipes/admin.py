@@ -1,47 +1,75 @@
 from django.contrib import admin
 
+from recipes.admin_utils import ScalableModelAdmin, recipe_filter, user_filter
 from recipes.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
-                            ShoppingCartRecipe, Tag)
+                            ShoppingCartIngredient, ShoppingCartRecipe, Tag,
+                            TimelineEntry)
 
 
 class IngredientRecipeInline(admin.TabularInline):
     model = IngredientRecipe
     min_num = 1
+    autocomplete_fields = ("ingredient",)
 
 
-class RecipeAdmin(admin.ModelAdmin):
-    search_fields = ("name", "author__id", "tags__id")
+class RecipeAdmin(ScalableModelAdmin):
+    search_fields = ("name",)
     list_display = ("name", "author", "favorite_count")
-    list_filter = ("author", "name", "tags")
+    list_filter = (user_filter("author", "автор"), "tags")
+    list_select_related = ("author",)
+    autocomplete_fields = ("author", "tags")
     inlines = [IngredientRecipeInline]
 
     def favorite_count(self, obj):
-        return obj.favorite_for.count()
+        return obj.favorites_count
+
+    favorite_count.admin_order_field = "favorites_count"
 
 
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(ScalableModelAdmin):
     search_fields = ("name",)
     list_display = ("name", "measurement_unit")
-    list_filter = ("name",)
+    list_filter = ("measurement_unit",)
 
 
 class TagAdmin(admin.ModelAdmin):
+    search_fields = ("name", "slug")
     list_display = ("name", "slug")
 
 
-class FavoriteAdmin(admin.ModelAdmin):
+class FavoriteAdmin(ScalableModelAdmin):
     list_display = ("user", "recipe")
-    list_filter = ("user", "recipe")
+    list_filter = (user_filter("user"), recipe_filter())
+    list_select_related = ("user", "recipe")
+    autocomplete_fields = ("user", "recipe")
 
 
-class ShoppingCartRecipeAdmin(admin.ModelAdmin):
+class ShoppingCartRecipeAdmin(ScalableModelAdmin):
     list_display = ("user", "recipe")
-    list_filter = ("user", "recipe")
+    list_filter = (user_filter("user"), recipe_filter())
+    list_select_related = ("user", "recipe")
+    autocomplete_fields = ("user", "recipe")
+
+
+class ShoppingCartIngredientAdmin(ScalableModelAdmin):
+    list_display = ("user", "ingredient", "total_amount")
+    list_filter = (user_filter("user"),)
+    list_select_related = ("user", "ingredient")
+    autocomplete_fields = ("user", "ingredient")
+
+
+class TimelineEntryAdmin(ScalableModelAdmin):
+    list_display = ("user", "recipe", "pub_date")
+    list_filter = (user_filter("user"), user_filter("author", "автор"))
+    list_select_related = ("user", "recipe")
+    autocomplete_fields = ("user", "recipe", "author")
 
 
-class IngredientRecipeAdmin(admin.ModelAdmin):
+class IngredientRecipeAdmin(ScalableModelAdmin):
     list_display = ("ingredient", "recipe")
-    list_filter = ("recipe",)
+    list_filter = (recipe_filter(),)
+    list_select_related = ("ingredient", "recipe")
+    autocomplete_fields = ("ingredient", "recipe")
 
 
 admin.site.register(Recipe, RecipeAdmin)
@@ -50,3 +78,5 @@ admin.site.register(Tag, TagAdmin)
 admin.site.register(Favorite, FavoriteAdmin)
 admin.site.register(IngredientRecipe, IngredientRecipeAdmin)
 admin.site.register(ShoppingCartRecipe, ShoppingCartRecipeAdmin)
+admin.site.register(ShoppingCartIngredient, ShoppingCartIngredientAdmin)
+admin.site.register(TimelineEntry, TimelineEntryAdmin)
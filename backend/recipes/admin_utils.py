@@ -0,0 +1,79 @@
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        connection = connections[self.object_list.db]
+        if connection.vendor != "postgresql" or query.where:
+            return super().count
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE relname = %s",
+                [self.object_list.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < ESTIMATED_COUNT_THRESHOLD:
+            return super().count
+        return int(row[0])
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class InputFilter(admin.SimpleListFilter):
+    template = "admin/input_filter.html"
+    lookup_fields = ()
+
+    def lookups(self, request, model_admin):
+        return ((),)
+
+    def choices(self, changelist):
+        all_choice = next(super().choices(changelist))
+        all_choice["query_parts"] = (
+            (key, value)
+            for key, value in changelist.get_filters_params().items()
+            if key != self.parameter_name
+        )
+        yield all_choice
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if not value:
+            return queryset
+        if value.isdigit():
+            return queryset.filter(**{f"{self.parameter_name}__id": value})
+        condition = Q()
+        for field in self.lookup_fields:
+            condition |= Q(**{f"{self.parameter_name}__{field}": value})
+        return queryset.filter(condition)
+
+
+def input_filter(field, filter_title, lookup_fields):
+    return type(
+        f"{field.title()}InputFilter",
+        (InputFilter,),
+        {
+            "parameter_name": field,
+            "title": filter_title,
+            "lookup_fields": lookup_fields,
+        },
+    )
+
+
+def user_filter(field, filter_title="пользователь"):
+    return input_filter(
+        field, filter_title, ("username__iexact", "email__iexact"))
+
+
+def recipe_filter(field="recipe", filter_title="рецепт"):
+    return input_filter(field, filter_title, ("name__icontains",))
@@ -0,0 +1,21 @@
+import csv
+import io
+
+from django.db import connection
+
+
+def insert(model, columns, objects):
+    if connection.vendor != "postgresql":
+        model.objects.bulk_create(objects)
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for obj in objects:
+        writer.writerow([getattr(obj, column) for column in columns])
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+                model._meta.db_table, ", ".join(columns)),
+            buffer,
+        )
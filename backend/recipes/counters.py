@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from recipes.models import Favorite, Recipe
+from users.models import Subscription
+
+User = get_user_model()
+
+
+def change_counter(queryset, field, delta):
+    return queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def count_subquery(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def recount(queryset, field, actual):
+    drifted = list(
+        queryset.annotate(actual=actual)
+        .exclude(**{field: F("actual")})
+        .values_list("pk", flat=True)
+    )
+    queryset.filter(pk__in=drifted).update(**{field: actual})
+    return len(drifted)
+
+
+def recount_favorites(recipes=None):
+    return recount(
+        Recipe.objects.all() if recipes is None else recipes,
+        "favorites_count",
+        count_subquery(Favorite.objects.all(), "recipe"),
+    )
+
+
+def recount_recipes(users=None):
+    return recount(
+        User.objects.all() if users is None else users,
+        "recipes_count",
+        count_subquery(Recipe.objects.all(), "author"),
+    )
+
+
+def recount_followers(users=None):
+    return recount(
+        User.objects.all() if users is None else users,
+        "followers_count",
+        count_subquery(Subscription.objects.all(), "subscribed_to"),
+    )
@@ -0,0 +1,68 @@
+import io
+import os
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+VARIANTS_DIR = "variants"
+
+
+def variant_name(name, variant, webp=False):
+    directory, filename = posixpath.split(name)
+    stem, extension = posixpath.splitext(filename)
+    if webp:
+        extension = ".webp"
+    return posixpath.join(
+        directory, VARIANTS_DIR, f"{stem}_{variant}{extension}")
+
+
+def save_variant(image, name, image_format):
+    if image_format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        default_storage.save(name, ContentFile(buffer.getvalue()))
+    else:
+        replace_file(path, buffer.getvalue())
+
+
+def replace_file(path, content):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+        os.chmod(temp_path, default_storage.file_permissions_mode or 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def has_variants(name):
+    return all(
+        default_storage.exists(variant_name(name, variant, webp))
+        for variant in settings.RECIPE_IMAGE_VARIANTS
+        for webp in (False, True)
+    )
+
+
+def create_variants(name):
+    with default_storage.open(name) as file, Image.open(file) as original:
+        image_format = original.format
+        for variant, size in settings.RECIPE_IMAGE_VARIANTS.items():
+            image = original.copy()
+            image.thumbnail((size, size))
+            save_variant(image, variant_name(name, variant), image_format)
+            save_variant(image, variant_name(name, variant, True), "WEBP")
+    return name
@@ -0,0 +1,16 @@
+from jobs.queue import job
+from recipes.images import create_variants
+from recipes.models import Recipe, TimelineEntry
+from recipes.versions import RECIPES, bump_version
+
+
+@job
+def create_image_variants(name):
+    create_variants(name)
+    Recipe.objects.filter(image=name).update(has_image_variants=True)
+    bump_version(RECIPES)
+
+
+@job
+def backfill_timelines(author_id):
+    TimelineEntry.objects.backfill(author_id)
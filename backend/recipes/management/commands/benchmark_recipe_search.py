@@ -0,0 +1,69 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from recipes.models import Recipe
+
+User = get_user_model()
+
+WORDS = (
+    "борщ", "суп", "салат", "пирог", "блины", "каша", "котлеты", "плов",
+    "курица", "говядина", "грибы", "сыр", "томаты", "картофель", "рыба",
+    "овощи", "шоколад", "ягоды", "творог", "запеканка", "с", "и",
+    "по-домашнему",
+)
+
+
+class Command(BaseCommand):
+    help = "Замер времени поиска рецептов по названию"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+        parser.add_argument(
+            "--queries", nargs="+", default=["борщ", "пирог с", "сыр"])
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, **options):
+        with transaction.atomic():
+            self.run(**options)
+            transaction.set_rollback(True)
+        self.stdout.write("Тестовые данные удалены")
+
+    def run(self, sizes, queries, repeat, batch_size, **options):
+        author = User.objects.create(
+            email="benchmark@foodgram.local", username="benchmark")
+        created = 0
+        for size in sorted(sizes):
+            while created < size:
+                count = min(batch_size, size - created)
+                Recipe.objects.bulk_create(
+                    [
+                        Recipe(
+                            name=" ".join(random.choices(WORDS, k=3)),
+                            image="recipes/benchmark.png",
+                            author=author,
+                            cooking_time=1,
+                        )
+                        for _ in range(count)
+                    ]
+                )
+                created += count
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE recipes_recipe")
+            for query in queries:
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    list(Recipe.objects.search(query)[:5])
+                    timings.append(time.perf_counter() - start)
+                self.stdout.write(
+                    f"{size:>9} рецептов, «{query}»: "
+                    f"{min(timings) * 1000:.2f} мс (мин.), "
+                    f"{sum(timings) / repeat * 1000:.2f} мс (сред.)"
+                )
@@ -0,0 +1,138 @@
+import itertools
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from scipy import sparse
+
+from recipes.bulk import insert
+from recipes.models import IngredientRecipe, Recipe, SimilarRecipe
+
+COMMON_FEATURE_FLOOR = 1000
+
+
+class Command(BaseCommand):
+    help = "Расчёт похожих рецептов по общим ингредиентам и тегам"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=settings.SIMILAR_RECIPES_TOP_K,
+            help="Количество похожих рецептов для каждого рецепта",
+        )
+        parser.add_argument(
+            "--metric",
+            choices=("jaccard", "cosine"),
+            default="jaccard",
+        )
+        parser.add_argument(
+            "--block-size",
+            type=int,
+            default=512,
+            help="Количество рецептов, обрабатываемых за один шаг",
+        )
+        parser.add_argument(
+            "--max-df",
+            type=float,
+            default=0.01,
+            help="Не учитывать признаки, которые встречаются в большей "
+                 "доле рецептов (соль, вода и т. п.)",
+        )
+
+    def handle(self, top_k, metric, block_size, max_df, **kwargs):
+        start = time.perf_counter()
+        recipe_ids = np.fromiter(
+            Recipe.objects.order_by("id")
+            .values_list("id", flat=True).iterator(),
+            dtype=np.int64,
+        )
+        matrix = self.build_matrix(recipe_ids, max_df)
+        sizes = np.asarray(matrix.sum(axis=1), dtype=np.float32).ravel()
+        transposed = matrix.T.tocsr()
+        total = 0
+        with transaction.atomic():
+            SimilarRecipe.objects.all().delete()
+            for first in range(0, len(recipe_ids), block_size):
+                neighbours = self.top_neighbours(
+                    matrix[first:first + block_size] @ transposed,
+                    first,
+                    sizes,
+                    top_k,
+                    metric,
+                )
+                insert(
+                    SimilarRecipe,
+                    ("recipe_id", "similar_id", "score"),
+                    [
+                        SimilarRecipe(
+                            recipe_id=int(recipe_ids[row]),
+                            similar_id=int(recipe_ids[column]),
+                            score=float(score),
+                        )
+                        for row, column, score in neighbours
+                    ],
+                )
+                total += len(neighbours)
+                self.stdout.write(
+                    f"Обработано рецептов: "
+                    f"{min(first + block_size, len(recipe_ids))}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово: {total} пар за {time.perf_counter() - start:.2f} с"))
+
+    def build_matrix(self, recipe_ids, max_df):
+        ingredients = self.load_pairs(IngredientRecipe.objects.values_list(
+            "recipe_id", "ingredient_id"))
+        tags = self.load_pairs(Recipe.tags.through.objects.values_list(
+            "recipe_id", "tag_id"))
+        offset = int(ingredients[:, 1].max(initial=0)) + 1
+        tags[:, 1] += offset
+        pairs = np.concatenate([ingredients, tags])
+        pairs = pairs[np.isin(pairs[:, 0], recipe_ids)]
+        features = int(pairs[:, 1].max(initial=0)) + 1
+        matrix = sparse.csr_matrix(
+            (
+                np.ones(len(pairs), dtype=np.float32),
+                (np.searchsorted(recipe_ids, pairs[:, 0]), pairs[:, 1]),
+            ),
+            shape=(len(recipe_ids), features),
+        )
+        matrix.data[:] = 1
+        frequency = np.bincount(matrix.indices, minlength=features)
+        rare = frequency <= max(
+            max_df * len(recipe_ids), COMMON_FEATURE_FLOOR)
+        return matrix[:, np.flatnonzero(rare)].tocsr()
+
+    def load_pairs(self, queryset):
+        return np.fromiter(
+            itertools.chain.from_iterable(queryset.iterator()),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+
+    def top_neighbours(self, block, first, sizes, top_k, metric):
+        block = block.tocsr()
+        rows = first + np.repeat(
+            np.arange(block.shape[0]), np.diff(block.indptr))
+        common = block.data
+        if metric == "jaccard":
+            scores = common / (sizes[rows] + sizes[block.indices] - common)
+        else:
+            scores = common / np.sqrt(sizes[rows] * sizes[block.indices])
+        scores[block.indices == rows] = 0
+        result = []
+        for row in range(block.shape[0]):
+            begin, end = block.indptr[row], block.indptr[row + 1]
+            row_scores = scores[begin:end]
+            if len(row_scores) > top_k:
+                best = np.argpartition(-row_scores, top_k)[:top_k]
+            else:
+                best = np.arange(len(row_scores))
+            for index in best[row_scores[best] > 0]:
+                result.append((
+                    first + row,
+                    block.indices[begin + index],
+                    row_scores[index],
+                ))
+        return result
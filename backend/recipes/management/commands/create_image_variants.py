@@ -0,0 +1,48 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from recipes.images import create_variants, has_variants
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Создание уменьшенных копий картинок рецептов"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Количество процессов (по умолчанию — число ядер)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Пересоздать уже существующие копии",
+        )
+
+    def handle(self, **options):
+        names = [
+            name for name in Recipe.objects.exclude(image="")
+            .values_list("image", flat=True).distinct().iterator()
+            if options["force"] or not has_variants(name)
+        ]
+        failed = 0
+        with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = {
+                executor.submit(create_variants, name): name for name in names
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {error}")
+                else:
+                    Recipe.objects.filter(image=futures[future]).update(
+                        has_image_variants=True)
+                    self.stdout.write(
+                        f"[{done}/{len(names)}] {futures[future]}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Обработано картинок: {len(names) - failed}, ошибок: {failed}"))
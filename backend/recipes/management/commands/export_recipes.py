@@ -0,0 +1,69 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Выгрузка рецептов в формате NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default="-",
+            help="Файл для выгрузки (по умолчанию — стандартный вывод)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Количество рецептов, загружаемых за один проход",
+        )
+
+    def handle(self, path, chunk_size, **kwargs):
+        file = sys.stdout if path == "-" else open(
+            path, "w", encoding="UTF-8")
+        exported = 0
+        last_id = 0
+        try:
+            while True:
+                recipes = list(
+                    Recipe.objects.with_related()
+                    .filter(id__gt=last_id)
+                    .order_by("id")[:chunk_size]
+                )
+                if not recipes:
+                    break
+                for recipe in recipes:
+                    file.write(json.dumps(
+                        self.serialize(recipe), ensure_ascii=False) + "\n")
+                exported += len(recipes)
+                last_id = recipes[-1].id
+                self.stderr.write(f"Выгружено рецептов: {exported}")
+        finally:
+            if file is not sys.stdout:
+                file.close()
+
+    def serialize(self, recipe):
+        return {
+            "id": recipe.id,
+            "name": recipe.name,
+            "text": recipe.text,
+            "image": recipe.image.name,
+            "cooking_time": recipe.cooking_time,
+            "pub_date": recipe.pub_date.isoformat(),
+            "updated_at": recipe.updated_at.isoformat(),
+            "author": recipe.author.email,
+            "tags": [tag.slug for tag in recipe.tags.all()],
+            "ingredients": [
+                {
+                    "name": item.ingredient.name,
+                    "measurement_unit": item.ingredient.measurement_unit,
+                    "amount": item.amount,
+                }
+                for item in recipe.ingredients.all()
+            ],
+        }
@@ -1,10 +1,13 @@
 import csv
+import time
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from foodgram.settings import BASE_DIR
 
 from recipes.models import Ingredient
+from recipes.versions import INGREDIENTS, bump_version
 
 PROJECT_DIR = Path(BASE_DIR).resolve().parent
 
@@ -12,13 +15,48 @@ PROJECT_DIR = Path(BASE_DIR).resolve().parent
 class Command(BaseCommand):
     help = "Импорт ингредиентов в базу данных"
 
-    def handle(self, **kwargs):
-        with open(
-            f"{PROJECT_DIR}\\data\\ingredients.csv", "r", encoding="UTF-8"
-        ) as file:
-            reader = csv.reader(file, delimiter=",")
-            for row in reader:
-                Ingredient.objects.get_or_create(
-                    name=row[0],
-                    measurement_unit=row[1]
-                )
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=PROJECT_DIR / "data" / "ingredients.csv",
+            help="CSV-файл со строками «название,единица измерения»",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Количество строк в одном INSERT",
+        )
+
+    def handle(self, path, batch_size, **kwargs):
+        start = time.perf_counter()
+        count_before = Ingredient.objects.count()
+        seen = set()
+        batch = []
+        with open(path, "r", encoding="UTF-8", newline="") as file, (
+            transaction.atomic()
+        ):
+            for row in csv.reader(file, delimiter=","):
+                if len(row) < 2:
+                    continue
+                key = (row[0].strip(), row[1].strip())
+                if not key[0] or key in seen:
+                    continue
+                seen.add(key)
+                batch.append(
+                    Ingredient(name=key[0], measurement_unit=key[1]))
+                if len(batch) >= batch_size:
+                    self.save_batch(batch, len(seen))
+                    batch = []
+            self.save_batch(batch, len(seen))
+        bump_version(INGREDIENTS)
+        created = Ingredient.objects.count() - count_before
+        self.stdout.write(self.style.SUCCESS(
+            f"Уникальных строк: {len(seen)}, добавлено: {created}, "
+            f"время: {time.perf_counter() - start:.2f} с"
+        ))
+
+    def save_batch(self, batch, processed):
+        Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+        self.stdout.write(f"Обработано строк: {processed}")
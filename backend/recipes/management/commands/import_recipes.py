@@ -0,0 +1,172 @@
+import itertools
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from recipes.bulk import insert
+from recipes.counters import recount_recipes
+from recipes.images import has_variants
+from recipes.jobs import create_image_variants
+from recipes.models import (ImportCheckpoint, Ingredient, IngredientRecipe,
+                            Recipe, Tag, TimelineEntry)
+from recipes.versions import RECIPES, bump_version
+
+User = get_user_model()
+
+
+@contextmanager
+def preserve_timestamps():
+    fields = [
+        Recipe._meta.get_field("pub_date"),
+        Recipe._meta.get_field("updated_at"),
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = "Загрузка рецептов из файла NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл, созданный export_recipes")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество рецептов в одной транзакции",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Имя точки восстановления в базе данных "
+                 "(по умолчанию абсолютный путь к файлу)",
+        )
+
+    def handle(self, path, batch_size, checkpoint, **kwargs):
+        start = time.perf_counter()
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            name=checkpoint or str(Path(path).resolve()))
+        done = checkpoint.line
+        self.authors = dict(User.objects.values_list("email", "id"))
+        self.tags = dict(Tag.objects.values_list("slug", "id"))
+        self.ingredients = {
+            (name, unit): pk
+            for pk, name, unit in Ingredient.objects.values_list(
+                "id", "name", "measurement_unit")
+        }
+        with open(path, encoding="UTF-8") as file, preserve_timestamps():
+            lines = itertools.islice(enumerate(file, 1), done, None)
+            while True:
+                batch = list(itertools.islice(lines, batch_size))
+                if not batch:
+                    break
+                done = batch[-1][0]
+                with transaction.atomic():
+                    self.import_batch(batch)
+                    checkpoint.line = done
+                    checkpoint.save(update_fields=("line",))
+                self.stdout.write(f"Загружено строк: {done}")
+        self.reset_sequences()
+        recount_recipes()
+        bump_version(RECIPES)
+        checkpoint.delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово: {done} строк за {time.perf_counter() - start:.2f} с"))
+
+    def import_batch(self, batch):
+        rows = []
+        recipes = []
+        for number, line in batch:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                recipes.append(self.build_recipe(number, row))
+            except (KeyError, ValueError) as error:
+                raise CommandError(
+                    f"Строка {number}: некорректные данные ({error!r})")
+            rows.append((number, row))
+        if not connection.features.can_return_ids_from_bulk_insert:
+            next_id = (
+                Recipe.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+            ) + 1
+            for offset, recipe in enumerate(recipes):
+                recipe.id = next_id + offset
+        Recipe.objects.bulk_create(recipes)
+        tags = []
+        ingredients = []
+        for (number, row), recipe in zip(rows, recipes):
+            for slug in row["tags"]:
+                tags.append(Recipe.tags.through(
+                    recipe_id=recipe.id,
+                    tag_id=self.resolve(self.tags, slug, number, "тег"),
+                ))
+            for item in row["ingredients"]:
+                ingredients.append(IngredientRecipe(
+                    recipe_id=recipe.id,
+                    ingredient_id=self.resolve(
+                        self.ingredients,
+                        (item["name"], item["measurement_unit"]),
+                        number,
+                        "ингредиент",
+                    ),
+                    amount=item["amount"],
+                ))
+        insert(Recipe.tags.through, ("recipe_id", "tag_id"), tags)
+        insert(
+            IngredientRecipe,
+            ("recipe_id", "ingredient_id", "amount"),
+            ingredients,
+        )
+        TimelineEntry.objects.backfill_authors(
+            {recipe.author_id for recipe in recipes})
+        self.enqueue_image_variants(recipes)
+
+    def enqueue_image_variants(self, recipes):
+        for image in {recipe.image.name for recipe in recipes}:
+            if not image:
+                continue
+            if has_variants(image):
+                Recipe.objects.filter(image=image).update(
+                    has_image_variants=True)
+            else:
+                create_image_variants.delay_once(image)
+
+    def build_recipe(self, number, row):
+        return Recipe(
+            name=row["name"],
+            text=row["text"],
+            image=row["image"],
+            cooking_time=row["cooking_time"],
+            pub_date=parse_datetime(row["pub_date"]),
+            updated_at=parse_datetime(
+                row.get("updated_at") or row["pub_date"]),
+            author_id=self.resolve(
+                self.authors, row["author"], number, "автор"),
+        )
+
+    def resolve(self, mapping, key, number, kind):
+        try:
+            return mapping[key]
+        except KeyError:
+            raise CommandError(f"Строка {number}: неизвестный {kind} {key}")
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [Recipe, IngredientRecipe, Recipe.tags.through])
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import TimelineEntry
+
+
+class Command(BaseCommand):
+    help = "Пересборка лент подписок пользователей"
+
+    @transaction.atomic
+    def handle(self, **kwargs):
+        TimelineEntry.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Записей в лентах: {TimelineEntry.objects.count()}"))
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from recipes.models import IngredientRecipe, ShoppingCartIngredient
+
+
+class Command(BaseCommand):
+    help = "Пересчёт сводных списков покупок пользователей"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только сверить таблицу с текущими корзинами",
+        )
+
+    def handle(self, **options):
+        expected = {
+            (user_id, ingredient_id): total_amount
+            for user_id, ingredient_id, total_amount in (
+                IngredientRecipe.objects
+                .values("recipe__in_shopping_carts__user", "ingredient")
+                .annotate(total_amount=Sum("amount"))
+                .values_list(
+                    "recipe__in_shopping_carts__user",
+                    "ingredient",
+                    "total_amount",
+                )
+                .iterator()
+            )
+            if user_id is not None
+        }
+        if options["check"]:
+            self.check_table(expected)
+            return
+        with transaction.atomic():
+            ShoppingCartIngredient.objects.all().delete()
+            ShoppingCartIngredient.objects.bulk_create(
+                (
+                    ShoppingCartIngredient(
+                        user_id=user_id,
+                        ingredient_id=ingredient_id,
+                        total_amount=total_amount,
+                    )
+                    for (user_id, ingredient_id), total_amount
+                    in expected.items()
+                ),
+                batch_size=1000,
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Пересчитано строк: {len(expected)}"))
+
+    def check_table(self, expected):
+        actual = {
+            (user_id, ingredient_id): total_amount
+            for user_id, ingredient_id, total_amount in (
+                ShoppingCartIngredient.objects.values_list(
+                    "user_id", "ingredient_id", "total_amount").iterator()
+            )
+        }
+        mismatched = [
+            key for key in expected.keys() | actual.keys()
+            if expected.get(key) != actual.get(key)
+        ]
+        for user_id, ingredient_id in sorted(mismatched):
+            self.stdout.write(
+                f"Пользователь {user_id}, ингредиент {ingredient_id}: "
+                f"ожидалось {expected.get((user_id, ingredient_id), 0)}, "
+                f"в таблице {actual.get((user_id, ingredient_id), 0)}"
+            )
+        if mismatched:
+            self.stdout.write(self.style.ERROR(
+                f"Расхождений: {len(mismatched)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Расхождений нет"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.counters import (recount_favorites, recount_followers,
+                              recount_recipes)
+
+
+class Command(BaseCommand):
+    help = "Пересчёт счётчиков избранного и рецептов пользователей"
+
+    @transaction.atomic
+    def handle(self, **kwargs):
+        self.stdout.write(
+            f"Исправлено рецептов: {recount_favorites()}")
+        self.stdout.write(
+            f"Исправлено пользователей: {recount_recipes()}")
+        self.stdout.write(
+            f"Исправлено подписчиков: {recount_followers()}")
+        self.stdout.write(self.style.SUCCESS("Счётчики пересчитаны"))
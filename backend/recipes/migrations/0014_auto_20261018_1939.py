@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:39
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+import django.db.models.deletion
+
+
+def fill_shopping_cart_ingredients(apps, schema_editor):
+    IngredientRecipe = apps.get_model('recipes', 'IngredientRecipe')
+    ShoppingCartIngredient = apps.get_model(
+        'recipes', 'ShoppingCartIngredient')
+    totals = (
+        IngredientRecipe.objects
+        .values('recipe__in_shopping_carts__user', 'ingredient')
+        .annotate(total_amount=Sum('amount'))
+        .values_list(
+            'recipe__in_shopping_carts__user', 'ingredient', 'total_amount')
+    )
+    ShoppingCartIngredient.objects.bulk_create(
+        [
+            ShoppingCartIngredient(
+                user_id=user_id,
+                ingredient_id=ingredient_id,
+                total_amount=total_amount,
+            )
+            for user_id, ingredient_id, total_amount in totals
+            if user_id is not None
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0013_auto_20220904_2145'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoppingCartIngredient',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_amount', models.PositiveIntegerField(default=0, verbose_name='Общее количество')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='in_shopping_carts', to='recipes.Ingredient', verbose_name='Ингредиент')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_cart_ingredients', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Ингредиент из списка покупок',
+                'verbose_name_plural': 'Ингредиенты из списка покупок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='shoppingcartingredient',
+            constraint=models.UniqueConstraint(fields=('user', 'ingredient'), name='unique_shopping_cart_ingredient'),
+        ),
+        migrations.RunPython(
+            fill_shopping_cart_ingredients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:47
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    IngredientRecipe = apps.get_model('recipes', 'IngredientRecipe')
+    ShoppingCartIngredient = apps.get_model(
+        'recipes', 'ShoppingCartIngredient')
+    duplicates = (
+        Ingredient.objects.values('name', 'measurement_unit')
+        .annotate(keep_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        keep_id = duplicate['keep_id']
+        others = Ingredient.objects.filter(
+            name=duplicate['name'],
+            measurement_unit=duplicate['measurement_unit'],
+        ).exclude(pk=keep_id)
+        for item in IngredientRecipe.objects.filter(ingredient__in=others):
+            if IngredientRecipe.objects.filter(
+                recipe_id=item.recipe_id, ingredient_id=keep_id
+            ).exists():
+                item.delete()
+            else:
+                item.ingredient_id = keep_id
+                item.save()
+        for item in ShoppingCartIngredient.objects.filter(
+            ingredient__in=others
+        ):
+            kept = ShoppingCartIngredient.objects.filter(
+                user_id=item.user_id, ingredient_id=keep_id).first()
+            if kept is None:
+                item.ingredient_id = keep_id
+                item.save()
+            else:
+                kept.total_amount += item.total_amount
+                kept.save()
+                item.delete()
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0017_auto_20261018_1946'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_timelines(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Subscription = apps.get_model('users', 'Subscription')
+    TimelineEntry = apps.get_model('recipes', 'TimelineEntry')
+    limit = getattr(settings, 'FEED_FANOUT_LIMIT', 1000)
+    size = getattr(settings, 'FEED_BACKFILL_SIZE', 100)
+    subscriptions = Subscription.objects.filter(
+        subscribed_to__followers_count__lte=limit
+    ).values_list('subscriber_id', 'subscribed_to_id')
+    for subscriber_id, author_id in subscriptions.iterator():
+        recipes = (
+            Recipe.objects.filter(author_id=author_id)
+            .order_by('-pub_date', '-id')
+            .values_list('id', 'pub_date')[:size]
+        )
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    user_id=subscriber_id,
+                    recipe_id=recipe_id,
+                    author_id=author_id,
+                    pub_date=pub_date,
+                )
+                for recipe_id, pub_date in recipes
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0019_recipe_favorites_count'),
+        ('users', '0008_user_followers_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='recipes.Recipe', verbose_name='Рецепт')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Лента подписок',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-pub_date', '-recipe'], name='timeline_user_pub_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_timeline_entry'),
+        ),
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:05
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce({0}.name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce({0}.text, '')), 'B')"
+)
+
+
+def create_search(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE OR REPLACE FUNCTION recipes_recipe_search_vector_update() '
+            'RETURNS trigger AS $$ BEGIN '
+            'NEW.search_vector := {}; RETURN NEW; '
+            'END $$ LANGUAGE plpgsql'.format(POSTGRES_VECTOR.format('NEW'))
+        )
+        schema_editor.execute(
+            'CREATE TRIGGER recipes_recipe_search_vector '
+            'BEFORE INSERT OR UPDATE OF name, text ON recipes_recipe '
+            'FOR EACH ROW EXECUTE PROCEDURE '
+            'recipes_recipe_search_vector_update()'
+        )
+        schema_editor.execute(
+            'UPDATE recipes_recipe SET search_vector = {}'.format(
+                POSTGRES_VECTOR.format('recipes_recipe'))
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS recipes_recipe_search_vector '
+            'ON recipes_recipe USING gin (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE recipes_recipe_fts USING fts5('
+            "name, text, content='recipes_recipe', content_rowid='id')"
+        )
+        schema_editor.execute(
+            'CREATE TRIGGER recipes_recipe_fts_insert '
+            'AFTER INSERT ON recipes_recipe BEGIN '
+            'INSERT INTO recipes_recipe_fts (rowid, name, text) '
+            'VALUES (new.id, new.name, new.text); END'
+        )
+        schema_editor.execute(
+            'CREATE TRIGGER recipes_recipe_fts_delete '
+            'AFTER DELETE ON recipes_recipe BEGIN '
+            'INSERT INTO recipes_recipe_fts '
+            '(recipes_recipe_fts, rowid, name, text) '
+            "VALUES ('delete', old.id, old.name, old.text); END"
+        )
+        schema_editor.execute(
+            'CREATE TRIGGER recipes_recipe_fts_update '
+            'AFTER UPDATE OF name, text ON recipes_recipe BEGIN '
+            'INSERT INTO recipes_recipe_fts '
+            '(recipes_recipe_fts, rowid, name, text) '
+            "VALUES ('delete', old.id, old.name, old.text); "
+            'INSERT INTO recipes_recipe_fts (rowid, name, text) '
+            'VALUES (new.id, new.name, new.text); END'
+        )
+        schema_editor.execute(
+            "INSERT INTO recipes_recipe_fts (recipes_recipe_fts) "
+            "VALUES ('rebuild')"
+        )
+
+
+def drop_search(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'DROP INDEX IF EXISTS recipes_recipe_search_vector')
+        schema_editor.execute(
+            'DROP TRIGGER IF EXISTS recipes_recipe_search_vector '
+            'ON recipes_recipe')
+        schema_editor.execute(
+            'DROP FUNCTION IF EXISTS recipes_recipe_search_vector_update()')
+    elif vendor == 'sqlite':
+        for trigger in ('insert', 'delete', 'update'):
+            schema_editor.execute(
+                f'DROP TRIGGER IF EXISTS recipes_recipe_fts_{trigger}')
+        schema_editor.execute('DROP TABLE IF EXISTS recipes_recipe_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0022_auto_20261018_2003'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(create_search, drop_search),
+    ]
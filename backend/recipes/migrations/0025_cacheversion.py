@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0024_recipe_author_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Название')),
+                ('value', models.CharField(max_length=32, verbose_name='Значение')),
+            ],
+            options={
+                'verbose_name': 'Версия кеша',
+                'verbose_name_plural': 'Версии кеша',
+            },
+        ),
+    ]
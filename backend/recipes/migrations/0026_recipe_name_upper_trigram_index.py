@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS recipes_recipe_name_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS recipes_recipe_name_upper_trgm '
+        'ON recipes_recipe USING gin (UPPER(name) gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'DROP INDEX IF EXISTS recipes_recipe_name_upper_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS recipes_recipe_name_trgm '
+        'ON recipes_recipe USING gin (name gin_trgm_ops)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0025_cacheversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0026_recipe_name_upper_trigram_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=500, primary_key=True, serialize=False, verbose_name='Название')),
+                ('line', models.PositiveIntegerField(default=0, verbose_name='Последняя загруженная строка')),
+            ],
+            options={
+                'verbose_name': 'Точка восстановления импорта',
+                'verbose_name_plural': 'Точки восстановления импорта',
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:44
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+from recipes.images import has_variants
+
+search = import_module('recipes.migrations.0023_recipe_search_vector')
+
+
+def fill_has_image_variants(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    images = (
+        Recipe.objects.exclude(image='')
+        .order_by()
+        .values_list('image', flat=True)
+        .distinct()
+    )
+    ready = [image for image in images.iterator() if has_variants(image)]
+    Recipe.objects.filter(image__in=ready).update(has_image_variants=True)
+
+
+def restore_sqlite_search(apps, schema_editor):
+    # SQLite rebuilds the table to add a column and loses its FTS triggers.
+    if schema_editor.connection.vendor == 'sqlite':
+        search.drop_search(apps, schema_editor)
+        search.create_search(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0027_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_sqlite_search),
+        migrations.AddField(
+            model_name='recipe',
+            name='has_image_variants',
+            field=models.BooleanField(default=False, verbose_name='Уменьшенные копии готовы'),
+        ),
+        migrations.RunPython(
+            fill_has_image_variants, migrations.RunPython.noop),
+        migrations.RunPython(restore_sqlite_search, migrations.RunPython.noop),
+    ]
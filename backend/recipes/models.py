@@ -1,11 +1,26 @@
+import re
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVectorField,
+                                            TrigramSimilarity)
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
 
 from recipes.validators import validate_hex_code, validate_nonzero
+from users.models import Subscription
 
 User = get_user_model()
 
+SEARCH_CONFIG = "russian"
+
+
+class Casefold(models.Func):
+    function = "CASEFOLD"
+    output_field = models.CharField()
+
 
 class Tag(models.Model):
     name = models.CharField(
@@ -42,11 +57,82 @@ class Ingredient(models.Model):
     class Meta:
         verbose_name = "Ингредиент"
         verbose_name_plural = "Ингредиенты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "measurement_unit"],
+                name="unique_ingredient"
+            )
+        ]
 
     def __str__(self):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    @staticmethod
+    def related_lookups():
+        return (
+            "tags",
+            models.Prefetch(
+                "ingredients",
+                queryset=IngredientRecipe.objects.select_related(
+                    "ingredient")
+            ),
+        )
+
+    def with_related(self):
+        return self.select_related("author").prefetch_related(
+            *self.related_lookups())
+
+    def with_user_flags(self, user):
+        if not user.is_authenticated:
+            return self
+        return self.annotate(
+            is_favorited=models.Exists(Favorite.objects.filter(
+                user=user, recipe=models.OuterRef("pk"))),
+            is_in_shopping_cart=models.Exists(
+                ShoppingCartRecipe.objects.filter(
+                    user=user, recipe=models.OuterRef("pk"))),
+        )
+
+    def search(self, text):
+        if connections[self.db].vendor != "postgresql":
+            return self.annotate(folded_name=Casefold("name")).filter(
+                folded_name__contains=text.casefold())
+        return self.filter(name__icontains=text).annotate(
+            similarity=TrigramSimilarity("name", text)
+        ).order_by("-similarity", "-pub_date")
+
+    def full_text_search(self, text):
+        words = re.findall(r"\w+", text)
+        if not words:
+            return self.none()
+        if connections[self.db].vendor == "postgresql":
+            query = SearchQuery(
+                " & ".join(f"{word}:*" for word in words),
+                config=SEARCH_CONFIG,
+                search_type="raw",
+            )
+            queryset = self.filter(search_vector=query).annotate(
+                rank=SearchRank(models.F("search_vector"), query))
+        else:
+            queryset = self.annotate(rank=RawSQL(
+                "SELECT -bm25(recipes_recipe_fts, 2.5, 1.0) "
+                "FROM recipes_recipe_fts "
+                "WHERE recipes_recipe_fts MATCH %s "
+                "AND rowid = recipes_recipe.id",
+                (" ".join(f'"{word}"*' for word in words),),
+                output_field=models.FloatField(),
+            )).filter(rank__isnull=False)
+        return queryset.order_by("-rank", "-pub_date", "-id")
+
+    def limited_per_author(self, limit):
+        return self.filter(pk__in=models.Subquery(
+            Recipe.objects.filter(author=models.OuterRef("author"))
+            .order_by("-pub_date", "-id").values("pk")[:limit]
+        ))
+
+
 class Recipe(models.Model):
     name = models.CharField(
         max_length=200,
@@ -61,6 +147,10 @@ class Recipe(models.Model):
         upload_to="recipes/",
         verbose_name="Картинка"
     )
+    has_image_variants = models.BooleanField(
+        default=False,
+        verbose_name="Уменьшенные копии готовы"
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -78,11 +168,36 @@ class Recipe(models.Model):
         auto_now_add=True,
         verbose_name="Дата"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата изменения"
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="В избранном"
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name="Поисковый вектор"
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
-        ordering = ("-pub_date",)
+        ordering = ("-pub_date", "-id")
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
+        indexes = [
+            models.Index(
+                fields=["-pub_date", "-id"], name="recipe_pub_date_id"
+            ),
+            models.Index(fields=["updated_at"], name="recipe_updated_at"),
+            models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="recipe_author_pub_date_id",
+            ),
+        ]
 
 
 class IngredientRecipe(models.Model):
@@ -163,3 +278,260 @@ class ShoppingCartRecipe(models.Model):
                 fields=["user", "recipe"], name="unique_shopping_cart_item"
             )
         ]
+
+
+class ShoppingCartIngredientQuerySet(models.QuerySet):
+    def add_amounts(self, user_ids, amounts):
+        amounts = {
+            ingredient_id: amount
+            for ingredient_id, amount in amounts.items() if amount
+        }
+        if not user_ids or not amounts:
+            return
+        self.bulk_create(
+            [
+                self.model(user_id=user_id, ingredient_id=ingredient_id)
+                for user_id in user_ids
+                for ingredient_id, amount in amounts.items() if amount > 0
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        self.filter(
+            user_id__in=user_ids, ingredient_id__in=amounts
+        ).update(total_amount=models.F("total_amount") + models.Case(
+            *[
+                models.When(ingredient_id=ingredient_id, then=amount)
+                for ingredient_id, amount in amounts.items()
+            ],
+            default=0,
+            output_field=models.IntegerField(),
+        ))
+        self.filter(user_id__in=user_ids, total_amount__lte=0).delete()
+
+    def add_recipe_amounts(self, recipe_id, amounts):
+        self.add_amounts(
+            list(ShoppingCartRecipe.objects.filter(
+                recipe_id=recipe_id).values_list("user_id", flat=True)),
+            amounts,
+        )
+
+
+class ShoppingCartIngredient(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="shopping_cart_ingredients",
+        verbose_name="Пользователь",
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name="in_shopping_carts",
+        verbose_name="Ингредиент",
+    )
+    total_amount = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Общее количество"
+    )
+
+    objects = ShoppingCartIngredientQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Ингредиент из списка покупок"
+        verbose_name_plural = "Ингредиенты из списка покупок"
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "ingredient"],
+                name="unique_shopping_cart_ingredient"
+            )
+        ]
+
+
+class TimelineEntryQuerySet(models.QuerySet):
+    def add_entries(self, author_id, user_ids, recipes):
+        self.bulk_create(
+            [
+                self.model(
+                    user_id=user_id,
+                    recipe_id=recipe_id,
+                    author_id=author_id,
+                    pub_date=pub_date,
+                )
+                for user_id in user_ids
+                for recipe_id, pub_date in recipes
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+    def fan_out(self, recipe):
+        self.add_entries(
+            recipe.author_id,
+            Subscription.objects.filter(
+                subscribed_to_id=recipe.author_id,
+                subscribed_to__followers_count__lte=(
+                    settings.FEED_FANOUT_LIMIT),
+            ).values_list("subscriber_id", flat=True),
+            [(recipe.id, recipe.pub_date)],
+        )
+
+    def backfill(self, author_id, user_ids=None):
+        recipes = list(
+            Recipe.objects.filter(
+                author_id=author_id,
+                author__followers_count__lte=settings.FEED_FANOUT_LIMIT,
+            )
+            .order_by("-pub_date", "-id")
+            .values_list("id", "pub_date")[:settings.FEED_BACKFILL_SIZE]
+        )
+        if not recipes:
+            return
+        if user_ids is None:
+            user_ids = Subscription.objects.filter(
+                subscribed_to_id=author_id
+            ).values_list("subscriber_id", flat=True)
+        self.add_entries(author_id, user_ids, recipes)
+
+    def backfill_authors(self, author_ids=None):
+        authors = User.objects.filter(
+            followers_count__gt=0,
+            followers_count__lte=settings.FEED_FANOUT_LIMIT,
+        )
+        if author_ids is not None:
+            authors = authors.filter(id__in=author_ids)
+        for author_id in authors.values_list("id", flat=True).iterator():
+            self.backfill(author_id)
+
+    def rebuild(self):
+        self.all().delete()
+        self.backfill_authors()
+
+    def feed(self, user, limit, position=None):
+        hot_authors = list(
+            User.objects.filter(
+                subscriber__subscriber=user,
+                followers_count__gt=settings.FEED_FANOUT_LIMIT,
+            ).values_list("id", flat=True)
+        )
+        entries = self.filter(user=user).exclude(author_id__in=hot_authors)
+        recipes = Recipe.objects.filter(author_id__in=hot_authors)
+        if position is not None:
+            pub_date, recipe_id = position
+            entries = entries.filter(
+                models.Q(pub_date__lt=pub_date)
+                | models.Q(pub_date=pub_date, recipe_id__lt=recipe_id)
+            )
+            recipes = recipes.filter(
+                models.Q(pub_date__lt=pub_date)
+                | models.Q(pub_date=pub_date, id__lt=recipe_id)
+            )
+        rows = list(
+            entries.order_by("-pub_date", "-recipe_id")
+            .values_list("pub_date", "recipe_id")[:limit]
+        )
+        if hot_authors:
+            rows.extend(
+                recipes.order_by("-pub_date", "-id")
+                .values_list("pub_date", "id")[:limit]
+            )
+            rows.sort(reverse=True)
+        return rows[:limit]
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline",
+        verbose_name="Пользователь",
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Рецепт",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Автор",
+    )
+    pub_date = models.DateTimeField(verbose_name="Дата публикации")
+
+    objects = TimelineEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Лента подписок"
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"],
+                name="unique_timeline_entry"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-pub_date", "-recipe"],
+                name="timeline_user_pub_date",
+            )
+        ]
+
+
+class SimilarRecipe(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="similar_recipes",
+        db_index=False,
+        verbose_name="Рецепт",
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Похожий рецепт",
+    )
+    score = models.FloatField(verbose_name="Сходство")
+
+    class Meta:
+        verbose_name = "Похожий рецепт"
+        verbose_name_plural = "Похожие рецепты"
+        indexes = [
+            models.Index(
+                fields=["recipe", "-score"],
+                name="similar_recipe_score",
+            )
+        ]
+
+
+class CacheVersion(models.Model):
+    name = models.CharField(
+        max_length=64,
+        primary_key=True,
+        verbose_name="Название",
+    )
+    value = models.CharField(max_length=32, verbose_name="Значение")
+
+    class Meta:
+        verbose_name = "Версия кеша"
+        verbose_name_plural = "Версии кеша"
+
+
+class ImportCheckpoint(models.Model):
+    name = models.CharField(
+        max_length=500,
+        primary_key=True,
+        verbose_name="Название",
+    )
+    line = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Последняя загруженная строка",
+    )
+
+    class Meta:
+        verbose_name = "Точка восстановления импорта"
+        verbose_name_plural = "Точки восстановления импорта"
@@ -0,0 +1,219 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from recipes.counters import change_counter
+from recipes.images import has_variants
+from recipes.jobs import backfill_timelines, create_image_variants
+from recipes.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
+                            ShoppingCartIngredient, ShoppingCartRecipe, Tag,
+                            TimelineEntry, User)
+from recipes.versions import (INGREDIENTS, RECIPES, TAGS, bump_version,
+                              user_version_name)
+from users.models import Subscription
+
+
+def casefold(value):
+    return value.casefold() if value is not None else None
+
+
+@receiver(connection_created)
+def register_sqlite_functions(sender, connection, **kwargs):
+    if connection.vendor == "sqlite":
+        connection.connection.create_function("CASEFOLD", 1, casefold)
+
+
+cart_receivers = threading.local()
+
+
+@contextmanager
+def cart_receivers_disabled():
+    cart_receivers.disabled = True
+    try:
+        yield
+    finally:
+        cart_receivers.disabled = False
+
+
+def cart_receivers_enabled(kwargs):
+    return not (
+        kwargs.get("raw") or getattr(cart_receivers, "disabled", False))
+
+
+def recipe_amounts(recipe_id):
+    return dict(IngredientRecipe.objects.filter(
+        recipe_id=recipe_id).values_list("ingredient_id", "amount"))
+
+
+@receiver(post_save, sender=ShoppingCartRecipe)
+def add_to_shopping_cart_ingredients(sender, instance, created, **kwargs):
+    if kwargs.get("raw") or not created:
+        return
+    ShoppingCartIngredient.objects.add_amounts(
+        [instance.user_id], recipe_amounts(instance.recipe_id))
+
+
+@receiver(post_delete, sender=ShoppingCartRecipe)
+def remove_from_shopping_cart_ingredients(sender, instance, **kwargs):
+    ShoppingCartIngredient.objects.add_amounts(
+        [instance.user_id],
+        {
+            ingredient_id: -amount
+            for ingredient_id, amount
+            in recipe_amounts(instance.recipe_id).items()
+        },
+    )
+
+
+@receiver(pre_save, sender=IngredientRecipe)
+def remember_recipe_ingredient(sender, instance, **kwargs):
+    instance._saved_row = None
+    if cart_receivers_enabled(kwargs) and instance.pk is not None:
+        instance._saved_row = IngredientRecipe.objects.filter(
+            pk=instance.pk
+        ).values_list("recipe_id", "ingredient_id", "amount").first()
+
+
+@receiver(post_save, sender=IngredientRecipe)
+def update_shopping_cart_ingredients(sender, instance, **kwargs):
+    if not cart_receivers_enabled(kwargs):
+        return
+    amounts = {instance.ingredient_id: instance.amount}
+    if instance._saved_row is not None:
+        recipe_id, ingredient_id, amount = instance._saved_row
+        if recipe_id == instance.recipe_id:
+            amounts[ingredient_id] = amounts.get(ingredient_id, 0) - amount
+        else:
+            ShoppingCartIngredient.objects.add_recipe_amounts(
+                recipe_id, {ingredient_id: -amount})
+    ShoppingCartIngredient.objects.add_recipe_amounts(
+        instance.recipe_id, amounts)
+
+
+@receiver(post_delete, sender=IngredientRecipe)
+def remove_shopping_cart_ingredients(sender, instance, **kwargs):
+    if not cart_receivers_enabled(kwargs):
+        return
+    ShoppingCartIngredient.objects.add_recipe_amounts(
+        instance.recipe_id, {instance.ingredient_id: -instance.amount})
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def bump_ingredients_version(sender, **kwargs):
+    bump_version(INGREDIENTS)
+    bump_version(RECIPES)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def bump_tags_version(sender, **kwargs):
+    bump_version(TAGS)
+    bump_version(RECIPES)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def bump_recipes_version(sender, action="post_save", **kwargs):
+    if action.startswith("post_"):
+        transaction.on_commit(lambda: bump_version(RECIPES))
+
+
+@receiver(post_save, sender=User)
+def bump_authors_version(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) - {"last_login"}:
+        transaction.on_commit(lambda: bump_version(RECIPES))
+        transaction.on_commit(
+            lambda: bump_version(user_version_name(instance.pk)))
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingCartRecipe)
+@receiver(post_delete, sender=ShoppingCartRecipe)
+def bump_user_version(sender, instance, **kwargs):
+    bump_version(user_version_name(instance.user_id))
+
+
+@receiver(post_save, sender=Recipe)
+def enqueue_image_variants(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    ready = bool(instance.image) and has_variants(instance.image.name)
+    if ready != instance.has_image_variants:
+        instance.has_image_variants = ready
+        Recipe.objects.filter(pk=instance.pk).update(has_image_variants=ready)
+    if instance.image and not ready:
+        create_image_variants.delay_once(instance.image.name)
+
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(sender, instance, created, **kwargs):
+    if kwargs.get("raw") or not created:
+        return
+    change_counter(
+        Recipe.objects.filter(pk=instance.recipe_id), "favorites_count", 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(sender, instance, **kwargs):
+    change_counter(
+        Recipe.objects.filter(pk=instance.recipe_id), "favorites_count", -1)
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    if kwargs.get("raw") or not created:
+        return
+    change_counter(
+        User.objects.filter(pk=instance.author_id), "recipes_count", 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(sender, instance, **kwargs):
+    change_counter(
+        User.objects.filter(pk=instance.author_id), "recipes_count", -1)
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_recipe(sender, instance, created, **kwargs):
+    if kwargs.get("raw") or not created:
+        return
+    TimelineEntry.objects.fan_out(instance)
+
+
+@receiver(post_save, sender=Subscription)
+def add_follower(sender, instance, created, **kwargs):
+    if kwargs.get("raw") or not created:
+        return
+    change_counter(
+        User.objects.filter(pk=instance.subscribed_to_id),
+        "followers_count",
+        1,
+    )
+    TimelineEntry.objects.backfill(
+        instance.subscribed_to_id, [instance.subscriber_id])
+
+
+@receiver(post_delete, sender=Subscription)
+def remove_follower(sender, instance, **kwargs):
+    change_counter(
+        User.objects.filter(pk=instance.subscribed_to_id),
+        "followers_count",
+        -1,
+    )
+    TimelineEntry.objects.filter(
+        user_id=instance.subscriber_id, author_id=instance.subscribed_to_id
+    ).delete()
+    if User.objects.filter(
+        pk=instance.subscribed_to_id,
+        followers_count=settings.FEED_FANOUT_LIMIT,
+    ).exists():
+        backfill_timelines.delay(instance.subscribed_to_id)
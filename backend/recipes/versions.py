@@ -0,0 +1,62 @@
+import time
+import uuid
+
+from django.conf import settings
+
+from recipes.models import CacheVersion
+
+INGREDIENTS = "ingredients"
+TAGS = "tags"
+RECIPES = "recipes"
+
+
+local_versions = {}
+
+
+def get_versions(*names):
+    now = time.monotonic()
+    versions = {}
+    for name in names:
+        version, expires = local_versions.get(name, (None, 0))
+        if expires > now:
+            versions[name] = version
+    missing = [name for name in names if name not in versions]
+    if missing:
+        versions.update(load_versions(missing))
+        expires = now + settings.CACHE_VERSION_TTL
+        for name in missing:
+            local_versions[name] = (versions[name], expires)
+    return [versions[name] for name in names]
+
+
+def load_versions(names):
+    versions = dict(CacheVersion.objects.filter(
+        name__in=names).values_list("name", "value"))
+    missing = [name for name in names if name not in versions]
+    if missing:
+        CacheVersion.objects.bulk_create(
+            [
+                CacheVersion(name=name, value=uuid.uuid4().hex)
+                for name in missing
+            ],
+            ignore_conflicts=True,
+        )
+        versions.update(CacheVersion.objects.filter(
+            name__in=missing).values_list("name", "value"))
+    return versions
+
+
+def get_version(name):
+    return get_versions(name)[0]
+
+
+def bump_version(name):
+    value = uuid.uuid4().hex
+    if not CacheVersion.objects.filter(name=name).update(value=value):
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(name=name, value=value)], ignore_conflicts=True)
+    local_versions.pop(name, None)
+
+
+def user_version_name(user_id):
+    return f"user:{user_id}"
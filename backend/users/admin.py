@@ -1,19 +1,28 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 
+from recipes.admin_utils import ScalableModelAdmin, user_filter
+
 from .models import Subscription
 
 User = get_user_model()
 
 
-class UserAdmin(admin.ModelAdmin):
-    list_display = ("username", "email")
-    list_filter = ("username", "email")
+class UserAdmin(ScalableModelAdmin):
+    search_fields = ("username", "email")
+    list_display = ("username", "email", "recipes_count")
+    list_filter = ("is_staff", "is_active")
+    ordering = ("id",)
 
 
-class SubscriptionAdmin(admin.ModelAdmin):
+class SubscriptionAdmin(ScalableModelAdmin):
     list_display = ("subscriber", "subscribed_to")
-    list_filter = ("subscriber", "subscribed_to")
+    list_filter = (
+        user_filter("subscriber", "подписчик"),
+        user_filter("subscribed_to", "автор"),
+    )
+    list_select_related = ("subscriber", "subscribed_to")
+    autocomplete_fields = ("subscriber", "subscribed_to")
 
 
 admin.site.register(User, UserAdmin)
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:59
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_followers_count(apps, schema_editor):
+    Subscription = apps.get_model('users', 'Subscription')
+    User = apps.get_model('users', 'User')
+    User.objects.update(followers_count=Coalesce(
+        Subquery(
+            Subscription.objects.filter(subscribed_to=OuterRef('pk'))
+            .order_by()
+            .values('subscribed_to')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        Value(0),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_recipes_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество подписчиков'),
+        ),
+        migrations.RunPython(fill_followers_count, migrations.RunPython.noop),
+    ]
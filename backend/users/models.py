@@ -4,6 +4,14 @@ from django.db import models
 
 class User(AbstractUser):
     email = models.EmailField(unique=True)
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество рецептов"
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество подписчиков"
+    )
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username", "first_name", "last_name"]
 
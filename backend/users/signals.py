@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.versions import bump_version, user_version_name
+from users.models import Subscription
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def bump_subscriber_version(sender, instance, **kwargs):
+    bump_version(user_version_name(instance.subscriber_id))